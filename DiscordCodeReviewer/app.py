@@ -1,7 +1,8 @@
 import os
+import asyncio
 import threading
 import logging
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -20,7 +21,6 @@ log = logging.getLogger('web')
 
 # Bot thread function
 def run_discord_bot():
-    import asyncio
     import bot
 
     # Create a new event loop for the bot thread
@@ -47,6 +47,25 @@ def health():
     """Health check endpoint"""
     return jsonify({"status": "healthy"})
 
+@app.route('/metrics')
+def metrics():
+    """Scheduler metrics in the Prometheus text format"""
+    if bot_thread is None:
+        return jsonify({"status": "unavailable", "reason": "bot not running"}), 503
+
+    from bot import bot as discord_bot
+    scheduler = discord_bot.get_cog("Scheduler")
+    if scheduler is None or not discord_bot.is_ready():
+        return jsonify({"status": "unavailable", "reason": "scheduler not loaded"}), 503
+
+    # Read the counters on the bot's own loop, not from this thread
+    try:
+        body = asyncio.run_coroutine_threadsafe(scheduler.metrics_text(), discord_bot.loop).result(timeout=5)
+    except Exception as e:
+        log.warning(f"Could not collect scheduler metrics: {e}")
+        return jsonify({"status": "unavailable", "reason": "timed out"}), 503
+    return Response(body, mimetype="text/plain; version=0.0.4")
+
 # Start the bot when the Flask app is initialized if a token is available
 if not os.environ.get("WEB_ONLY", False) and os.environ.get("DISCORD_TOKEN"):
     bot_thread = threading.Thread(target=run_discord_bot, daemon=True)
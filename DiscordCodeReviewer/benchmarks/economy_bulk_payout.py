@@ -0,0 +1,86 @@
+"""Throughput of Economy.apply_deltas against paying members one at a time
+
+Runs the same payout three ways against a fresh guild database:
+
+  per-call commit   one transaction per member (separate lock, connection
+                    and commit, like running /modifybalance in a loop with
+                    write-through)
+  per-call ledger   /modifybalance as it runs today, queued on the
+                    write-behind ledger and flushed at the end
+  apply_deltas      every change in one transaction with executemany
+
+    python benchmarks/economy_bulk_payout.py --members 5000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cogs.economy import BalanceCache, Economy, GuildEconomy  # noqa: E402
+
+GUILD_ID = 1
+
+async def per_call_commit(economy: GuildEconomy, user_ids, amount: int):
+    for user_id in user_ids:
+        async with economy.locks.hold(user_id), economy.get_db() as db:
+            await economy.update_balance(user_id, amount, "admin_modification", "bench", db=db)
+
+async def per_call_ledger(economy: GuildEconomy, user_ids, amount: int):
+    for user_id in user_ids:
+        await economy.update_balance(user_id, amount, "admin_modification", "bench")
+    await economy.ledger.flush()
+
+async def bulk(economy: GuildEconomy, user_ids, amount: int):
+    await economy.apply_deltas([(user_id, amount, "admin_modification", "bench") for user_id in user_ids])
+
+async def run(name: str, payout, members: int, cold: bool) -> float:
+    """Seconds taken by one payout to every member in a fresh database"""
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        cog = Economy(bot=None)
+        await cog.cog_load()
+        try:
+            economy = await cog.economy(GUILD_ID)
+            user_ids = list(range(1, members + 1))
+            await economy.apply_deltas([(user_id, 100, "seed", "") for user_id in user_ids])
+            if cold:
+                # Start from an empty cache so every balance is read back from SQLite
+                cache = economy.ledger.accounts
+                economy.ledger.accounts = BalanceCache(cache.max_size, cache.ttl)
+
+            start = time.perf_counter()
+            await payout(economy, user_ids, 25)
+            elapsed = time.perf_counter() - start
+
+            total = sum([await economy.get_balance(user_id) for user_id in user_ids])
+            assert total == members * 125, f"{name}: expected {members * 125:,}, found {total:,}"
+        finally:
+            await cog.cog_unload()
+            os.chdir(Path(__file__).resolve().parent)
+    return elapsed
+
+async def main(args):
+    print(f"Paying {args.members:,} members ({'cold' if args.cold else 'warm'} balance cache)\n")
+    results = {}
+    for name, payout in (
+        ("per-call commit", per_call_commit),
+        ("per-call ledger", per_call_ledger),
+        ("apply_deltas", bulk),
+    ):
+        results[name] = await run(name, payout, args.members, args.cold)
+
+    baseline = results["per-call commit"]
+    for name, elapsed in results.items():
+        print(f"{name:>16}: {elapsed * 1000:9.1f} ms  {args.members / elapsed:12,.0f} ops/sec  "
+              f"({baseline / elapsed:.1f}x)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=5000)
+    parser.add_argument("--cold", action="store_true", help="Evict balances first so every account is read from SQLite")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,272 @@
+"""Load test for the Economy cog's /pay, /buy, /daily and /work commands
+
+Drives the command callbacks directly with stub ctx/Member objects, so no
+gateway or token is needed. Reports latency percentiles and throughput per
+command, then checks the ledger invariants against the database:
+
+  - every /pay moved crystals without creating or destroying any
+  - every balance equals the sum of that member's transactions, in
+    memory, in SQLite and on the leaderboard
+  - limited stock never went negative and matches completed purchases
+
+Exits non-zero when an invariant fails, a command raises, or a threshold is
+missed, so it can run in CI as a regression gate:
+
+    python benchmarks/economy_load.py --ops 20000 --concurrency 64 \\
+        --max-p99-ms 50 --min-ops-per-sec 2000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cogs.economy import Economy  # noqa: E402
+
+SEED_BALANCE = 1000
+CHARM_PRICE = 50
+
+class FakeAvatar:
+    url = "https://cdn.discordapp.com/embed/avatars/0.png"
+
+class FakeMember:
+    """Just enough of discord.Member for the economy commands"""
+
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.bot = False
+        self.roles = []
+        self.display_name = f"member{user_id}"
+        self.mention = f"<@{user_id}>"
+        self.display_avatar = FakeAvatar()
+
+    async def add_roles(self, *roles, reason=None):
+        self.roles.extend(roles)
+
+    def __str__(self):
+        return self.display_name
+
+class FakeGuild:
+    def __init__(self, guild_id: int, members):
+        self.id = guild_id
+        self.members = {member.id: member for member in members}
+
+    def get_member(self, user_id: int):
+        return self.members.get(user_id)
+
+    def get_role(self, role_id: int):
+        return None
+
+class FakeContext:
+    """Records replies instead of sending them"""
+
+    def __init__(self, author: FakeMember, guild: FakeGuild):
+        self.author = author
+        self.guild = guild
+        self.replies = []
+
+    async def send(self, content=None, **kwargs):
+        self.replies.append((content, kwargs.get("embed")))
+
+    async def defer(self, **kwargs):
+        pass
+
+    @property
+    def title(self) -> str:
+        """Title of the last embed sent, or its plain text"""
+        content, embed = self.replies[-1] if self.replies else (None, None)
+        return embed.title if embed else (content or "")
+
+class FakeBot:
+    def get_user(self, user_id: int):
+        return None
+
+class Stats:
+    def __init__(self):
+        self.latencies = {}  # {command: [seconds]}
+        self.errors = {}  # {command: count}
+        self.pays = {}  # {guild_id: completed transfers}
+        self.purchases = {}  # {guild_id: completed charm purchases}
+
+    def record(self, command: str, elapsed: float):
+        self.latencies.setdefault(command, []).append(elapsed)
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+async def run_op(cog: Economy, guild: FakeGuild, charm_id: int, command: str, stats: Stats):
+    members = list(guild.members.values())
+    ctx = FakeContext(random.choice(members), guild)
+
+    start = time.perf_counter()
+    try:
+        if command == "pay":
+            recipient = random.choice(members)
+            while recipient is ctx.author:
+                recipient = random.choice(members)
+            await Economy.pay.callback(cog, ctx, random.randint(1, 50), recipient)
+        elif command == "buy":
+            await Economy.buy.callback(cog, ctx, charm_id)
+        elif command == "daily":
+            await Economy.daily.callback(cog, ctx)
+        else:
+            await Economy.work.callback(cog, ctx)
+    except Exception as e:
+        stats.errors[command] = stats.errors.get(command, 0) + 1
+        if stats.errors[command] == 1:
+            print(f"!! {command} raised {type(e).__name__}: {e}")
+        return
+    stats.record(command, time.perf_counter() - start)
+
+    if ctx.title == "💸 Transfer Complete":
+        stats.pays[guild.id] = stats.pays.get(guild.id, 0) + 1
+    elif ctx.title == "✅ Purchase Complete":
+        stats.purchases[guild.id] = stats.purchases.get(guild.id, 0) + 1
+
+async def setup_guild(cog: Economy, guild: FakeGuild, stock: int) -> int:
+    """Seed balances and a limited shop item, returning its id"""
+    economy = await cog.economy(guild.id)
+    await economy.apply_deltas([(user_id, SEED_BALANCE, "seed", "") for user_id in guild.members])
+
+    author = next(iter(guild.members.values()))
+    await Economy.additem.callback(
+        cog, FakeContext(author, guild), "Load Test Charm", "Only exists under load", CHARM_PRICE, None, stock, 0
+    )
+    return max(economy.catalog.items)
+
+async def check_invariants(cog: Economy, guild: FakeGuild, charm_id: int, stock: int, stats: Stats):
+    """Failed invariants for one guild, as messages"""
+    economy = await cog.economy(guild.id)
+    await economy.ledger.flush()
+    failures = []
+
+    db = sqlite3.connect(economy.db_path)
+    try:
+        # Transfers create and destroy nothing
+        transfers = db.execute("""
+            SELECT COUNT(*), COALESCE(SUM(amount), 0) FROM transactions
+            WHERE type IN ('transfer_in', 'transfer_out')
+        """).fetchone()
+        if transfers[1] != 0:
+            failures.append(f"transfers net {transfers[1]:+,} crystals instead of 0")
+        if transfers[0] != 2 * stats.pays.get(guild.id, 0):
+            failures.append(f"{transfers[0]:,} transfer rows for {stats.pays.get(guild.id, 0):,} completed pays")
+
+        # Balances agree with the ledger, the cache and the leaderboard
+        ledger = dict(db.execute("SELECT user_id, SUM(amount) FROM transactions GROUP BY user_id"))
+        balances = dict(db.execute("SELECT user_id, balance FROM economy"))
+        for user_id in guild.members:
+            stored = balances.get(user_id, 0)
+            if stored != ledger.get(user_id, 0):
+                failures.append(f"member {user_id}: balance {stored:,} but transactions sum to {ledger.get(user_id, 0):,}")
+            cached = await economy.get_balance(user_id)
+            if cached != stored:
+                failures.append(f"member {user_id}: cached balance {cached:,} but stored {stored:,}")
+        if economy.leaderboard.page(0, 1) and economy.leaderboard.page(0, 1)[0][1] != max(balances.values()):
+            failures.append("leaderboard top balance disagrees with the economy table")
+
+        # Stock only moves with completed purchases
+        remaining = db.execute("SELECT stock FROM shop_items WHERE id = ?", (charm_id,)).fetchone()[0]
+        sold = db.execute(
+            "SELECT COALESCE(SUM(quantity), 0) FROM user_inventory WHERE item_id = ?", (charm_id,)
+        ).fetchone()[0]
+        if remaining < 0:
+            failures.append(f"charm stock went negative ({remaining})")
+        if remaining + sold != stock or sold != stats.purchases.get(guild.id, 0):
+            failures.append(
+                f"charm stock {remaining} + sold {sold} != {stock}, "
+                f"{stats.purchases.get(guild.id, 0)} purchases completed"
+            )
+    finally:
+        db.close()
+    return [f"guild {guild.id}: {failure}" for failure in failures]
+
+async def main(args) -> int:
+    random.seed(args.seed)
+    mix = []
+    for part in args.mix.split(","):
+        command, weight = part.split("=")
+        mix += [command.strip()] * int(weight)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        cog = Economy(FakeBot())
+        await cog.cog_load()
+        try:
+            guilds = []
+            for index in range(args.guilds):
+                base = (index + 1) * 1_000_000
+                guilds.append(FakeGuild(index + 1, [FakeMember(base + n) for n in range(args.members)]))
+            charms = {guild.id: await setup_guild(cog, guild, args.stock) for guild in guilds}
+
+            stats = Stats()
+            queue = asyncio.Queue()
+            for _ in range(args.ops):
+                queue.put_nowait((random.choice(guilds), random.choice(mix)))
+
+            async def worker():
+                while not queue.empty():
+                    guild, command = queue.get_nowait()
+                    await run_op(cog, guild, charms[guild.id], command, stats)
+
+            start = time.perf_counter()
+            await asyncio.gather(*[worker() for _ in range(args.concurrency)])
+            elapsed = time.perf_counter() - start
+
+            failures = []
+            for guild in guilds:
+                failures += await check_invariants(cog, guild, charms[guild.id], args.stock, stats)
+        finally:
+            await cog.cog_unload()
+            os.chdir(Path(__file__).resolve().parent)
+
+    completed = sum(len(samples) for samples in stats.latencies.values())
+    ops_per_sec = completed / elapsed
+    print(f"{args.ops:,} ops, {args.concurrency} concurrent, {args.guilds} guild(s) x {args.members} members\n")
+    print(f"{'command':>8} {'ops':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    everything = []
+    for command in sorted(set(mix)):
+        samples = stats.latencies.get(command, [])
+        everything += samples
+        if samples:
+            print(f"{command:>8} {len(samples):>8,} {percentile(samples, 50) * 1000:>9.2f} "
+                  f"{percentile(samples, 95) * 1000:>9.2f} {percentile(samples, 99) * 1000:>9.2f} "
+                  f"{stats.errors.get(command, 0):>7}")
+    p99 = percentile(everything, 99) * 1000 if everything else 0.0
+    print(f"\n{completed:,} completed in {elapsed:.2f}s: {ops_per_sec:,.0f} ops/sec, overall p99 {p99:.2f} ms")
+
+    if stats.errors:
+        failures.append(f"{sum(stats.errors.values()):,} commands raised")
+    if args.max_p99_ms and p99 > args.max_p99_ms:
+        failures.append(f"p99 {p99:.2f} ms is over the {args.max_p99_ms} ms budget")
+    if args.min_ops_per_sec and ops_per_sec < args.min_ops_per_sec:
+        failures.append(f"{ops_per_sec:,.0f} ops/sec is under the {args.min_ops_per_sec:,} floor")
+
+    if failures:
+        print("\nFAIL")
+        for failure in failures[:20]:
+            print(f"  - {failure}")
+        return 1
+
+    print("\nOK: crystals conserved, balances consistent, stock accounted for")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--members", type=int, default=200, help="Members per guild")
+    parser.add_argument("--guilds", type=int, default=1)
+    parser.add_argument("--stock", type=int, default=100, help="Units of the limited item per guild")
+    parser.add_argument("--mix", default="pay=70,buy=10,daily=10,work=10", help="Command weights")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-p99-ms", type=float, default=0, help="Fail above this p99 (0 disables)")
+    parser.add_argument("--min-ops-per-sec", type=int, default=0, help="Fail below this throughput (0 disables)")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,145 @@
+"""Before/after query plans and timings for the economy schema migrations
+
+Builds a synthetic economy.db at the schema version just before the query
+indexes, runs the cog's hot queries, applies the remaining migrations and
+runs them again.
+
+    python benchmarks/economy_query_plans.py --users 20000 --transactions 300000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cogs import SQLitePool  # noqa: E402
+from cogs.economy import MIGRATIONS  # noqa: E402
+
+# Schema version the "before" run is measured at
+BASELINE_VERSION = 3
+
+QUERIES = {
+    "daily streak": (
+        """SELECT COUNT(*) as streak FROM transactions
+           WHERE user_id = ? AND type = 'daily' AND timestamp > ?""",
+        lambda user_id, now: (user_id, (now - timedelta(days=7)).isoformat())
+    ),
+    "user transactions": (
+        """SELECT amount, type, reference, timestamp FROM transactions
+           WHERE user_id = ? ORDER BY timestamp DESC LIMIT 10""",
+        lambda user_id, now: (user_id,)
+    ),
+    "recent transactions": (
+        """SELECT user_id, amount, type, reference, timestamp FROM transactions
+           ORDER BY timestamp DESC LIMIT 10""",
+        lambda user_id, now: ()
+    ),
+    "owned count": (
+        """SELECT COALESCE(SUM(quantity), 0) as owned FROM user_inventory
+           WHERE user_id = ? AND item_id = ?""",
+        lambda user_id, now: (user_id, 1)
+    ),
+    "inventory": (
+        """SELECT i.item_id, s.name, i.quantity, s.description
+           FROM user_inventory i JOIN shop_items s ON i.item_id = s.id
+           WHERE i.user_id = ? ORDER BY i.purchased_at DESC""",
+        lambda user_id, now: (user_id,)
+    ),
+    "purchase counts": (
+        """SELECT id, name, price, stock,
+               (SELECT COUNT(*) FROM user_inventory WHERE item_id = shop_items.id) as total_purchased
+           FROM shop_items ORDER BY id""",
+        lambda user_id, now: ()
+    ),
+}
+
+async def seed(pool: SQLitePool, users: int, transactions: int):
+    """Fill the database with a plausible spread of members, purchases and history"""
+    now = datetime.utcnow()
+    types = ["work"] * 6 + ["daily"] * 2 + ["transfer_in", "transfer_out", "purchase"]
+
+    async with pool.transaction() as db:
+        await db.executemany(
+            "INSERT INTO economy (user_id, balance, lifetime_earned) VALUES (?, ?, ?)",
+            [(user_id, random.randint(0, 50000), random.randint(0, 90000)) for user_id in range(1, users + 1)]
+        )
+        await db.executemany(
+            "INSERT INTO shop_items (name, description, price, stock, max_per_user) VALUES (?, ?, ?, ?, ?)",
+            [(f"Item {i}", "Synthetic item", 100 * i, -1, 5) for i in range(1, 21)]
+        )
+        await db.executemany(
+            "INSERT OR IGNORE INTO user_inventory (user_id, item_id, quantity, purchased_at) VALUES (?, ?, ?, ?)",
+            [
+                (random.randint(1, users), random.randint(1, 20), random.randint(1, 3),
+                 (now - timedelta(minutes=random.randint(0, 90 * 24 * 60))).isoformat())
+                for _ in range(users * 2)
+            ]
+        )
+        await db.executemany(
+            "INSERT INTO transactions (user_id, amount, type, reference, timestamp) VALUES (?, ?, ?, ?, ?)",
+            [
+                (random.randint(1, users), random.randint(-500, 500), random.choice(types), "",
+                 (now - timedelta(seconds=random.randint(0, 90 * 86400))).isoformat())
+                for _ in range(transactions)
+            ]
+        )
+
+async def measure(pool: SQLitePool, users: int, repeats: int) -> dict:
+    """Query plan and median latency (ms) for every hot query"""
+    results = {}
+    now = datetime.utcnow()
+    async with pool.acquire() as db:
+        for name, (sql, params) in QUERIES.items():
+            cursor = await db.execute(f"EXPLAIN QUERY PLAN {sql}", params(1, now))
+            plan = [row['detail'] for row in await cursor.fetchall()]
+
+            timings = []
+            for _ in range(repeats):
+                args = params(random.randint(1, users), now)
+                start = time.perf_counter()
+                cursor = await db.execute(sql, args)
+                await cursor.fetchall()
+                timings.append((time.perf_counter() - start) * 1000)
+
+            results[name] = (plan, statistics.median(timings))
+    return results
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = SQLitePool(Path(tmp) / "economy.db")
+        await pool.open()
+        try:
+            await pool.migrate([m for m in MIGRATIONS if m[0] <= BASELINE_VERSION])
+            await seed(pool, args.users, args.transactions)
+            before = await measure(pool, args.users, args.repeats)
+
+            version = await pool.migrate(MIGRATIONS)
+            # Fresh connections so no statement prepared against the old schema is reused
+            await pool.close()
+            await pool.open()
+            after = await measure(pool, args.users, args.repeats)
+        finally:
+            await pool.close()
+
+    print(f"{args.users:,} users, {args.transactions:,} transactions, "
+          f"schema v{BASELINE_VERSION} -> v{version}\n")
+    for name in QUERIES:
+        plan_before, ms_before = before[name]
+        plan_after, ms_after = after[name]
+        speedup = ms_before / ms_after if ms_after else float("inf")
+        print(f"== {name}: {ms_before:.3f} ms -> {ms_after:.3f} ms ({speedup:.1f}x)")
+        print(f"   before: {' | '.join(plan_before)}")
+        print(f"   after:  {' | '.join(plan_after)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--transactions", type=int, default=300000)
+    parser.add_argument("--repeats", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,182 @@
+"""Fuzz and benchmark the time-expression parser behind /remind and /schedule
+
+Three kinds of checks, all seeded so failures reproduce:
+
+  durations   random compound durations ("2 days, 4h 30m") must add up
+              exactly, through parse_duration and parse_when
+  wall clock  random weekday/day + clock expressions in random time zones
+              must land on that weekday and local time, in the future,
+              within the expected roll-forward window
+  fuzz        mutated and random inputs must never raise; they either
+              parse or return None
+
+Then times every expression in a fixed corpus and reports microseconds per
+parse. Exits non-zero on any failure, or when the mean parse is slower than
+--max-us, so it can run in CI:
+
+    python benchmarks/scheduler_time_parser.py --cases 20000 --max-us 50
+"""
+import argparse
+import random
+import string
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cogs import parse_duration, parse_when  # noqa: E402
+
+ZONES = ["UTC", "Europe/London", "America/New_York", "Asia/Kolkata", "Australia/Lord_Howe", "Pacific/Chatham"]
+UNITS = [
+    (604800, ["w", "wk", "week", "weeks"]),
+    (86400, ["d", "day", "days"]),
+    (3600, ["h", "hr", "hrs", "hour", "hours"]),
+    (60, ["m", "min", "mins", "minute", "minutes"]),
+    (1, ["s", "sec", "secs", "second", "seconds"]),
+]
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+CORPUS = [
+    "30m", "1h30m", "2 days, 4 hours", "in 90 seconds", "1w 2d 3h", "9pm", "21:30", "tomorrow",
+    "tomorrow 9am", "tonight", "fri 18:00", "friday at noon", "next monday 9:15am", "oct 31",
+    "31 october 2027", "2026-10-31", "2026-10-31 18:00", "2026-10-31T18:00:00+02:00",
+    "9pm tomorrow", "noon on friday", "not a time", "",
+]
+# Inputs that once raised instead of returning None
+EDGE_CASES = [
+    "999999999999 weeks", "99999999999999999999999999d", "0001-01-01T00:00+05:00",
+    "9999-12-31T23:59-05:00", "dec 31 9999 11pm", "feb 29", "feb 29 2027", "24:00", "0am",
+]
+
+def random_now(rng: random.Random) -> datetime:
+    return datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=rng.randrange(3 * 365 * 86400))
+
+def check_durations(rng: random.Random, cases: int):
+    failures = []
+    for _ in range(cases):
+        expected = 0
+        parts = []
+        for seconds, names in rng.sample(UNITS, rng.randint(1, len(UNITS))):
+            amount = rng.randint(1, 99)
+            expected += amount * seconds
+            parts.append(f"{amount}{rng.choice(['', ' '])}{rng.choice(names)}")
+        text = rng.choice(["", "in "]) + rng.choice(["", " ", ", ", " and "]).join(parts)
+        now = random_now(rng)
+
+        if parse_duration(text) != timedelta(seconds=expected):
+            failures.append(f"parse_duration({text!r}) = {parse_duration(text)}, expected {expected}s")
+        elif parse_when(text, now=now) != (now + timedelta(seconds=expected)).replace(tzinfo=None):
+            failures.append(f"parse_when({text!r}) at {now} = {parse_when(text, now=now)}")
+    return failures
+
+def check_wall_clock(rng: random.Random, cases: int):
+    failures = []
+    for _ in range(cases):
+        zone = ZoneInfo(rng.choice(ZONES))
+        now = random_now(rng)
+        hour, minute = rng.randrange(24), rng.choice([0, 15, 30, 45, rng.randrange(60)])
+        clock = rng.choice([
+            f"{hour:02d}:{minute:02d}",
+            f"{hour % 12 or 12}:{minute:02d}{'pm' if hour >= 12 else 'am'}",
+        ])
+
+        weekday = rng.randrange(7)
+        day = rng.choice([WEEKDAYS[weekday], WEEKDAYS[weekday][:3], None])
+        text = f"{day} {clock}" if day else clock
+        result = parse_when(text, zone, now)
+        if result is None:
+            failures.append(f"parse_when({text!r}) returned None")
+            continue
+
+        local = result.replace(tzinfo=timezone.utc).astimezone(zone)
+        window = timedelta(days=7 if day else 1, hours=2)  # Plus slack for DST gaps
+        problems = []
+        if result.replace(tzinfo=timezone.utc) <= now:
+            problems.append("not in the future")
+        if result.replace(tzinfo=timezone.utc) - now > window:
+            problems.append(f"more than {window} ahead")
+        if day and local.weekday() != weekday:
+            problems.append(f"lands on {WEEKDAYS[local.weekday()]}")
+        if (local.hour, local.minute) != (hour, minute) and local.dst() == now.astimezone(zone).dst():
+            problems.append(f"lands at {local:%H:%M}")
+        if problems:
+            failures.append(f"parse_when({text!r}, {zone}) at {now:%Y-%m-%d %H:%M}Z -> {local}: {', '.join(problems)}")
+    return failures
+
+def fuzz(rng: random.Random, cases: int):
+    alphabet = string.ascii_lowercase + string.digits + " :-,.+TZ"
+    failures = []
+    for index in range(cases):
+        if index < len(EDGE_CASES):
+            text = EDGE_CASES[index]
+        elif rng.random() < 0.5:
+            text = list(rng.choice(CORPUS) or "x")
+            for _ in range(rng.randint(1, 4)):
+                position = rng.randrange(len(text) + 1)
+                action = rng.randrange(3)
+                if action == 0:
+                    text.insert(position, rng.choice(alphabet))
+                elif action == 1 and text:
+                    del text[min(position, len(text) - 1)]
+                elif text:
+                    text[min(position, len(text) - 1)] = rng.choice(alphabet)
+            text = "".join(text)
+        else:
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+
+        try:
+            result = parse_when(text, ZoneInfo(rng.choice(ZONES)), random_now(rng))
+        except Exception as e:
+            failures.append(f"parse_when({text!r}) raised {type(e).__name__}: {e}")
+            continue
+        if result is not None and not isinstance(result, datetime):
+            failures.append(f"parse_when({text!r}) returned {result!r}")
+    return failures
+
+def benchmark(rounds: int) -> float:
+    """Mean microseconds per parse over the corpus"""
+    zone = ZoneInfo("America/New_York")
+    now = datetime(2026, 10, 17, 14, 5, tzinfo=timezone.utc)
+    print(f"{'expression':>28} {'us/parse':>9}  result")
+    total = 0.0
+    for text in CORPUS:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            result = parse_when(text, zone, now)
+        elapsed = (time.perf_counter() - start) / rounds * 1e6
+        total += elapsed
+        print(f"{text!r:>28} {elapsed:>9.2f}  {result}")
+    return total / len(CORPUS)
+
+def main(args) -> int:
+    rng = random.Random(args.seed)
+    failures = []
+    for name, check in (("durations", check_durations), ("wall clock", check_wall_clock), ("fuzz", fuzz)):
+        found = check(rng, args.cases)
+        print(f"{name:>10}: {args.cases:,} cases, {len(found):,} failures")
+        failures += found
+
+    print()
+    mean = benchmark(args.rounds)
+    print(f"\nmean {mean:.2f} us/parse")
+    if args.max_us and mean > args.max_us:
+        failures.append(f"mean parse {mean:.2f} us is over the {args.max_us} us budget")
+
+    if failures:
+        print("\nFAIL")
+        for failure in failures[:20]:
+            print(f"  - {failure}")
+        return 1
+
+    print("\nOK")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=5000, help="Generated cases per check")
+    parser.add_argument("--rounds", type=int, default=2000, help="Timed parses per corpus expression")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-us", type=float, default=0, help="Fail above this mean parse time (0 disables)")
+    sys.exit(main(parser.parse_args()))
@@ -1,6 +1,22 @@
+import asyncio
+import aiosqlite
 import discord
+import heapq
+import itertools
+import logging
+import re
+import time
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta, timezone, tzinfo
 from discord.ext import commands
-from typing import Union, List, Optional, Callable, Dict, Any
+from pathlib import Path
+from typing import Union, List, Optional, Callable, Dict, Any, AsyncGenerator, Awaitable, Tuple
+
+# Initialize logging
+log = logging.getLogger(__name__)
+
+# (version, description, step) - step runs inside the migration's transaction
+Migration = Tuple[int, str, Callable[[aiosqlite.Connection], Awaitable[None]]]
 
 class CovenTools:
     """Shared utilities for all cogs with performance optimizations"""
@@ -82,12 +98,464 @@ class CovenTools:
         log = logging.getLogger('bot')
         log.error(error_message)
 
+class SQLitePool:
+    """Long-lived pool of aiosqlite connections shared by a cog
+
+    Each connection keeps its own worker thread and statement cache for the
+    lifetime of the cog, so hot queries are prepared once and reused instead
+    of paying for a new thread and a fresh parse on every command.
+    """
+
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA busy_timeout=5000",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-8000",
+    )
+
+    def __init__(self, path: Union[str, Path], size: int = 4, cached_statements: int = 256):
+        self.path = Path(path)
+        self.size = size
+        self._cached_statements = cached_statements
+        self._connections: List[aiosqlite.Connection] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._open_lock = asyncio.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return bool(self._connections)
+
+    @property
+    def in_use(self) -> int:
+        """Connections currently borrowed"""
+        return len(self._connections) - self._idle.qsize() if self._idle else 0
+
+    async def open(self):
+        """Open every connection in the pool and apply the pragmas"""
+        async with self._open_lock:
+            if self._connections:
+                return
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._idle = asyncio.Queue()
+            for _ in range(self.size):
+                # Autocommit mode: transactions are opened explicitly below
+                db = await aiosqlite.connect(
+                    self.path,
+                    isolation_level=None,
+                    cached_statements=self._cached_statements
+                )
+                db.row_factory = aiosqlite.Row
+                for pragma in self.PRAGMAS:
+                    await db.execute(pragma)
+                self._connections.append(db)
+                self._idle.put_nowait(db)
+
+    async def close(self):
+        """Close every connection in the pool"""
+        async with self._open_lock:
+            connections, self._connections = self._connections, []
+            self._idle = None
+            for db in connections:
+                await db.close()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncGenerator[aiosqlite.Connection, None]:
+        """Borrow a connection for autocommit reads"""
+        if not self._connections:
+            await self.open()
+
+        idle = self._idle
+        db = await idle.get()
+        try:
+            yield db
+        finally:
+            idle.put_nowait(db)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncGenerator[aiosqlite.Connection, None]:
+        """Borrow a connection inside a write transaction, committed on exit"""
+        async with self.acquire() as db:
+            await db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+                await db.commit()
+            except BaseException:
+                await db.rollback()
+                raise
+
+    async def migrate(self, migrations: List[Migration]) -> int:
+        """Apply pending migrations in order, tracking the schema version in PRAGMA user_version
+
+        Each migration commits in its own short transaction, so readers on
+        other WAL connections keep working while the schema evolves.
+        """
+        version = 0
+        for target, description, step in sorted(migrations, key=lambda m: m[0]):
+            async with self.transaction() as db:
+                cursor = await db.execute("PRAGMA user_version")
+                version = (await cursor.fetchone())[0]
+                if version >= target:
+                    continue
+
+                await step(db)
+                await db.execute(f"PRAGMA user_version = {int(target)}")
+                version = target
+            log.info(f"Migrated {self.path.name} to schema v{target}: {description}")
+        return version
+
+    @staticmethod
+    async def add_column(db: aiosqlite.Connection, table: str, column: str, declaration: str):
+        """ALTER TABLE ... ADD COLUMN unless the column already exists"""
+        cursor = await db.execute(f"PRAGMA table_info({table})")
+        if column not in [row['name'] for row in await cursor.fetchall()]:
+            await db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+class PageView(discord.ui.View):
+    """Previous/next buttons over embeds rendered on demand"""
+
+    def __init__(self, author, render: Callable[[int], Awaitable[discord.Embed]],
+                 page_count: int, timeout: float = 120.0):
+        super().__init__(timeout=timeout)
+        self.author = author
+        self.render = render
+        self.page_count = page_count
+        self.page = 0
+        self._sync_buttons()
+
+    async def start(self, ctx, **kwargs):
+        """Send the first page, attaching the buttons only when there is more than one"""
+        embed = await self.render(self.page)
+        if self.page_count > 1:
+            return await ctx.send(embed=embed, view=self, **kwargs)
+        return await ctx.send(embed=embed, **kwargs)
+
+    def _sync_buttons(self):
+        self.previous_page.disabled = self.page <= 0
+        self.next_page.disabled = self.page >= self.page_count - 1
+
+    async def _turn(self, interaction: discord.Interaction, step: int):
+        if interaction.user != self.author:
+            return await interaction.response.send_message("These pages aren't yours to turn.", ephemeral=True)
+
+        self.page = max(0, min(self.page_count - 1, self.page + step))
+        self._sync_buttons()
+        embed = await self.render(self.page)
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary, emoji="⬅️")
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._turn(interaction, -1)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.primary, emoji="➡️")
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._turn(interaction, 1)
+
+class TimerDispatcher:
+    """One task firing due timers from a min-heap, instead of a sleeping task per timer
+
+    ``schedule`` and ``cancel`` are O(log n) and O(1): cancelled entries are
+    left in the heap as tombstones and skipped when they surface. The
+    dispatcher sleeps until the earliest deadline (or until something
+    earlier is scheduled) and hands every due timer to ``callback`` in
+    batches of up to ``batch_size`` (key, payload) pairs, pausing
+    ``batch_interval`` seconds after a full batch so a backlog of overdue
+    timers drains at a steady rate. Deadlines are Unix timestamps;
+    ``on_fire(key, seconds_late)`` is told how late each timer fired.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[List[Tuple[Any, Any]]], Awaitable[None]],
+        batch_size: int = 50,
+        max_sleep: float = 60.0,
+        batch_interval: float = 0.0,
+        on_fire: Optional[Callable[[Any, float], None]] = None
+    ):
+        self._callback = callback
+        self._on_fire = on_fire
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.max_sleep = max_sleep  # Re-check the clock at least this often
+        self._heap: List[list] = []  # [when, seq, key, payload]; key None means cancelled
+        self._entries: Dict[Any, list] = {}  # {key: heap entry}
+        self._counter = itertools.count()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def __iter__(self):
+        return iter(list(self._entries))
+
+    @property
+    def next_due(self) -> Optional[float]:
+        """Deadline of the earliest live timer"""
+        self._drop_cancelled_head()
+        return self._heap[0][0] if self._heap else None
+
+    def _drop_cancelled_head(self):
+        while self._heap and self._heap[0][2] is None:
+            heapq.heappop(self._heap)
+
+    def when(self, key) -> Optional[float]:
+        entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def schedule(self, key, when: float, payload: Any = None):
+        """Fire ``key`` at ``when``, replacing any timer already set for it"""
+        self.cancel(key)
+        entry = [when, next(self._counter), key, payload]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry:
+            self._wake.set()
+
+    def cancel(self, key) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+
+        entry[2] = None
+        # Rebuild once tombstones outnumber live timers
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._entries):
+            self._heap = [e for e in self._heap if e[2] is not None]
+            heapq.heapify(self._heap)
+        return True
+
+    def _pop_due(self, now: float) -> List[Tuple[Any, Any]]:
+        batch = []
+        while self._heap and len(batch) < self.batch_size:
+            when, _, key, payload = self._heap[0]
+            if key is None:
+                heapq.heappop(self._heap)
+                continue
+            if when > now:
+                break
+            heapq.heappop(self._heap)
+            del self._entries[key]
+            batch.append((key, payload))
+            if self._on_fire:
+                self._on_fire(key, now - when)
+        return batch
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            # wait_for swallows a cancel that lands as the wake event fires, so the loop checks a flag too
+            self._stopping = True
+            self._task.cancel()
+            self._wake.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while not self._stopping:
+            self._wake.clear()
+            now = time.time()
+            batch = self._pop_due(now)
+            if batch:
+                try:
+                    await self._callback(batch)
+                except Exception as e:
+                    log.error(f"Timer callback failed for {len(batch)} timers: {e}")
+                if len(batch) == self.batch_size and self.batch_interval:
+                    await asyncio.sleep(self.batch_interval)
+                continue
+
+            # Skip past tombstones so they don't cause a wake-up
+            self._drop_cancelled_head()
+            delay = self._heap[0][0] - now if self._heap else self.max_sleep
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(0.0, min(delay, self.max_sleep)))
+            except asyncio.TimeoutError:
+                pass
+
+# Time expressions: "1h30m", "in 2 days", "tomorrow 9pm", "fri 18:00", "oct 31", ISO 8601.
+# Every pattern is compiled once at import; a parse is a handful of regex matches.
+_DURATION_UNITS = {"w": 604800, "d": 86400, "h": 3600, "m": 60, "s": 1}
+_DURATION_PART = re.compile(
+    r"(\d+(?:\.\d+)?)\s*(w(?:eeks?|ks?)?|d(?:ays?)?|h(?:ours?|rs?)?|m(?:in(?:ute)?s?)?|s(?:ec(?:ond)?s?)?)"
+    r"(?![a-z])\s*(?:,|and\b)?\s*"
+)
+_WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+_MONTHS = ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec")
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?"
+_DAY = re.compile(
+    r"(?:on\s+)?(?:"
+    r"(?P<relative>today|tonight|tomorrow|tmrw|tmr)"
+    r"|(?:(?P<next>next)\s+)?(?P<weekday>mon|tue|wed|thu|fri|sat|sun)[a-z]*"
+    r"|(?P<iso>\d{4}-\d{2}-\d{2})"
+    rf"|(?P<month>{_MONTH})\s+(?P<mday>\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s+(?P<year>\d{{4}}))?"
+    rf"|(?P<mday_first>\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?(?P<month_second>{_MONTH})(?:,?\s+(?P<year_second>\d{{4}}))?"
+    r")(?![a-z0-9])"
+)
+_CLOCK = re.compile(
+    r"(?:at\s+)?(?:(?P<named>noon|midnight)|(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<meridiem>[ap]\.?m\.?)?)"
+)
+_ISO_DATETIME = re.compile(r"\d{4}-\d{2}-\d{2}[t ]\d{1,2}:\d{2}")
+
+def parse_duration(text: str) -> Optional[timedelta]:
+    """Parse a compound duration like 30m, 1h30m, "2 days, 4 hours" or "in 90 seconds" """
+    text = text.strip().lower()
+    if text.startswith("in "):
+        text = text[3:].lstrip()
+
+    seconds = 0.0
+    position = 0
+    while position < len(text):
+        match = _DURATION_PART.match(text, position)
+        if not match:
+            return None
+        seconds += float(match.group(1)) * _DURATION_UNITS[match.group(2)[0]]
+        position = match.end()
+    if not position:
+        return None
+    try:
+        return timedelta(seconds=seconds)
+    except OverflowError:
+        return None
+
+def _parse_clock(text: str, bare_hour: bool) -> Optional[Tuple[int, int]]:
+    """(hour, minute) for 9pm, 21:30, 9:15am, noon; a bare "9" only when ``bare_hour``"""
+    match = _CLOCK.fullmatch(text)
+    if not match:
+        return None
+    if match["named"]:
+        return (12, 0) if match["named"] == "noon" else (0, 0)
+    if not (bare_hour or match["minute"] or match["meridiem"]):
+        return None
+
+    hour, minute = int(match["hour"]), int(match["minute"] or 0)
+    if match["meridiem"]:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if match["meridiem"][0] == "p" else 0)
+    if hour > 23 or minute > 59:
+        return None
+    return hour, minute
+
+def _with_year(moment, year: int):
+    """``moment`` in the first year from ``year`` on that has its day; Feb 29 waits for a leap year"""
+    for candidate in range(year, year + 8):
+        try:
+            return moment.replace(year=candidate)
+        except ValueError:
+            continue
+    raise ValueError(f"no {moment:%b %d} within eight years of {year}")
+
+def _parse_day(
+    match: "re.Match", today: date
+) -> Tuple[Optional[date], Optional[timedelta], bool, Optional[Tuple[int, int]]]:
+    """(day, how far to roll it forward if already past, roll it a year instead, default clock) for a _DAY match"""
+    if match["relative"]:
+        if match["relative"] in ("today", "tonight"):
+            return today, None, False, (20, 0) if match["relative"] == "tonight" else None
+        return today + timedelta(days=1), None, False, None
+    if match["weekday"]:
+        ahead = (_WEEKDAYS.index(match["weekday"]) - today.weekday()) % 7
+        if match["next"] and not ahead:
+            ahead = 7  # "next monday" on a Monday means a week from today
+        return today + timedelta(days=ahead), timedelta(days=7), False, None
+    try:
+        if match["iso"]:
+            return date.fromisoformat(match["iso"]), None, False, None
+        month = match["month"] or match["month_second"]
+        day = int(match["mday"] or match["mday_first"])
+        year = match["year"] or match["year_second"]
+        month = _MONTHS.index(month[:3]) + 1
+        # 2000 was a leap year, so only impossible dates fail here
+        parsed = date(int(year), month, day) if year else _with_year(date(2000, month, day), today.year)
+        # A date without a year means its next occurrence
+        return parsed, None, not year, None
+    except ValueError:
+        return None, None, False, None
+
+def parse_when(text: str, tz: Optional[tzinfo] = None, now: Optional[datetime] = None) -> Optional[datetime]:
+    """Resolve a time expression to a naive UTC datetime, or None if it isn't one
+
+    Accepts compound durations ("1h30m", "in 2 days"), clock times ("9pm",
+    "21:30"), days ("tomorrow", "fri", "oct 31", "2026-10-31") with an
+    optional clock time in either order, and ISO 8601 timestamps. Wall-clock
+    times are read in ``tz`` (UTC by default); a day without a time means 9am.
+    """
+    tz = tz or timezone.utc
+    now = now or datetime.now(timezone.utc)
+    text = " ".join(text.lower().split())
+    if not text:
+        return None
+    try:
+        return _resolve_when(text, tz, now)
+    except (OverflowError, ValueError):
+        # Out of datetime's range, e.g. "9999999 weeks" or year 1 with an offset
+        return None
+
+def _resolve_when(text: str, tz: tzinfo, now: datetime) -> Optional[datetime]:
+    duration = parse_duration(text)
+    if duration is not None:
+        return (now + duration).astimezone(timezone.utc).replace(tzinfo=None)
+
+    if _ISO_DATETIME.match(text):
+        try:
+            moment = datetime.fromisoformat(text.upper())
+        except ValueError:
+            moment = None
+        if moment:
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=tz)
+            return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+    local_now = now.astimezone(tz)
+    day, roll, next_year, clock = local_now.date(), timedelta(days=1), False, None
+
+    match = _DAY.match(text)
+    if match:
+        # Day first, then an optional clock time: "tomorrow 9pm", "fri at 18:00"
+        day, roll, next_year, default_clock = _parse_day(match, local_now.date())
+        rest = text[match.end():].lstrip(" ,")
+        clock = _parse_clock(rest, bare_hour=True) if rest else (default_clock or (9, 0))
+    else:
+        # Clock first, then an optional day: "9pm", "9pm tomorrow", "noon on friday"
+        match = _CLOCK.match(text)
+        if not match:
+            return None
+        rest = text[match.end():].lstrip(" ,")
+        clock = _parse_clock(match.group(0), bare_hour=bool(rest))
+        if rest:
+            match = _DAY.fullmatch(rest)
+            if not match:
+                return None
+            day, roll, next_year, _ = _parse_day(match, local_now.date())
+
+    if day is None or clock is None:
+        return None
+
+    moment = datetime(day.year, day.month, day.day, *clock, tzinfo=tz)
+    if moment <= local_now and next_year:
+        moment = _with_year(moment, moment.year + 1)
+    elif moment <= local_now and roll:
+        moment = moment + roll
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
 # Decorator shortcuts
 export = commands.check_any
 cooldown = commands.cooldown
 
 # Public exports
-__all__ = ['export', 'cooldown', 'CovenTools']
+__all__ = [
+    'export', 'cooldown', 'CovenTools', 'SQLitePool', 'PageView', 'Migration', 'TimerDispatcher',
+    'parse_duration', 'parse_when'
+]
 
 # Auto-initialize when imported by bot
 async def setup(bot):
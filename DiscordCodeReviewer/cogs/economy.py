@@ -2,75 +2,1181 @@ import sqlite3
 import discord
 import asyncio
 import aiosqlite
+import bisect
+import csv
+import gzip
+import io
+import json
+import logging
+import os
 import random
-from discord.ext import commands
+import re
+import time
+from collections import OrderedDict
+from discord.ext import commands, tasks
 from discord import app_commands
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Union, AsyncGenerator
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union, AsyncGenerator
 from pathlib import Path
 from contextlib import asynccontextmanager
-from .. import CovenTools
+from cogs import CovenTools, SQLitePool, PageView, Migration
+from config import (
+    ECONOMY_DURABILITY_WINDOW_MS,
+    ECONOMY_FLUSH_BATCH_SIZE,
+    ECONOMY_CACHE_SIZE,
+    ECONOMY_CACHE_TTL,
+    ECONOMY_CACHE_WRITE_THROUGH,
+    ECONOMY_ARCHIVE_AFTER_DAYS,
+    ECONOMY_ARCHIVE_DIR,
+    ECONOMY_COMPACT_INTERVAL_HOURS,
+    ECONOMY_IDLE_MINUTES,
+    ECONOMY_LEGACY_GUILD_ID
+)
+
+# Initialize logging
+log = logging.getLogger(__name__)
+
+# Single database from before economies were split per guild
+LEGACY_DB = Path("data/economy.db")
+
+async def _create_base_schema(db: aiosqlite.Connection):
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS economy (
+            user_id INTEGER PRIMARY KEY,
+            balance INTEGER DEFAULT 0,
+            last_daily TEXT,
+            lifetime_earned INTEGER DEFAULT 0
+        )
+    """)
+
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS shop_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE,
+            description TEXT,
+            price INTEGER,
+            role_id INTEGER,
+            stock INTEGER DEFAULT -1,
+            max_per_user INTEGER DEFAULT 1
+        )
+    """)
+
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS user_inventory (
+            user_id INTEGER,
+            item_id INTEGER,
+            quantity INTEGER DEFAULT 1,
+            purchased_at TEXT,
+            PRIMARY KEY (user_id, item_id)
+        )
+    """)
+
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            amount INTEGER,
+            type TEXT,
+            reference TEXT,
+            timestamp TEXT
+        )
+    """)
 
-class Economy(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-        self.db_path = Path("data/economy.db")
-        self.db_path.parent.mkdir(exist_ok=True)
-        self.currency_name = "crystals"
-        self.currency_emoji = "💎"
+async def _add_ledger_sequence(db: aiosqlite.Connection):
+    await SQLitePool.add_column(db, "economy", "ledger_seq", "INTEGER DEFAULT 0")
+    await SQLitePool.add_column(db, "transactions", "seq", "INTEGER")
+    await db.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_seq ON transactions(seq)"
+    )
 
-        # Cache and locks
-        self._balance_cache: Dict[int, int] = {}
-        self._db_lock = asyncio.Lock()
+async def _add_balance_index(db: aiosqlite.Connection):
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_economy_balance ON economy(balance DESC)"
+    )
 
-        # Initialize database
-        self.bot.loop.create_task(self._init_db())
+async def _add_query_indexes(db: aiosqlite.Connection):
+    # Per-user history by type and time (daily streaks, /transactions <user>)
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_transactions_user_type_time "
+        "ON transactions(user_id, type, timestamp)"
+    )
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_transactions_user_time "
+        "ON transactions(user_id, timestamp)"
+    )
+    # Recent transactions across everyone
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_transactions_time ON transactions(timestamp)"
+    )
+    # Ownership checks in /shop and /buy are already served by the
+    # (user_id, item_id) primary key; these cover /inventory ordering and
+    # the per-item purchase counts in /listitems
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_inventory_user_purchased "
+        "ON user_inventory(user_id, purchased_at)"
+    )
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_inventory_item ON user_inventory(item_id)"
+    )
 
-    async def _init_db(self):
-        """Initialize database tables if they don't exist"""
-        async with self.get_db() as db:
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS economy (
-                    user_id INTEGER PRIMARY KEY,
-                    balance INTEGER DEFAULT 0,
-                    last_daily TEXT,
-                    lifetime_earned INTEGER DEFAULT 0
-                )
-            """)
+async def _add_daily_streak(db: aiosqlite.Connection):
+    await SQLitePool.add_column(db, "economy", "daily_streak", "INTEGER DEFAULT 0")
+    # Backfill with the streak the old transaction scan would have computed
+    await db.execute("""
+        UPDATE economy SET daily_streak = (
+            SELECT COUNT(*) FROM transactions t
+            WHERE t.user_id = economy.user_id
+            AND t.type = 'daily'
+            AND t.timestamp > strftime('%Y-%m-%dT%H:%M:%S', 'now', '-7 days')
+        )
+        WHERE last_daily IS NOT NULL
+    """)
+
+async def _add_transaction_summaries(db: aiosqlite.Connection):
+    # Compacted history: one row per user, day and transaction type
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS transaction_summaries (
+            user_id INTEGER,
+            day TEXT,
+            type TEXT,
+            count INTEGER DEFAULT 0,
+            total INTEGER DEFAULT 0,
+            PRIMARY KEY (user_id, day, type)
+        )
+    """)
+
+# Append-only: never edit a released migration, add a new one instead
+MIGRATIONS: List[Migration] = [
+    (1, "base schema", _create_base_schema),
+    (2, "ledger sequence numbers", _add_ledger_sequence),
+    (3, "balance index", _add_balance_index),
+    (4, "transaction and inventory query indexes", _add_query_indexes),
+    (5, "materialized daily streak", _add_daily_streak),
+    (6, "transaction summaries", _add_transaction_summaries),
+]
+
+class BalanceCache:
+    """Bounded LRU/TTL cache of accounts with hit, miss and eviction counters
+
+    Accounts with changes that SQLite doesn't have yet are pinned: they are
+    the only copy of that state, so they are never evicted or expired until
+    the ledger unpins them.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()  # {user_id: (loaded_at, account)}
+        self._pins: Dict[int, int] = {}  # {user_id: unflushed change count}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, user_id: int) -> Optional[Dict[str, Any]]:
+        item = self._entries.get(user_id)
+        if item is None:
+            self.misses += 1
+            return None
+
+        loaded_at, account = item
+        if self.ttl and user_id not in self._pins and time.monotonic() - loaded_at > self.ttl:
+            # Re-read so edits made outside this process become visible
+            del self._entries[user_id]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return account
+
+    def put(self, user_id: int, account: Dict[str, Any]) -> Dict[str, Any]:
+        """Store an account, replacing any cached copy"""
+        self._entries[user_id] = (time.monotonic(), account)
+        self._entries.move_to_end(user_id)
+        self.trim()
+        return account
+
+    def setdefault(self, user_id: int, account: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a freshly loaded account unless another load already did"""
+        item = self._entries.get(user_id)
+        if item is not None:
+            return item[1]
+        return self.put(user_id, account)
+
+    def pin(self, user_id: int):
+        self._pins[user_id] = self._pins.get(user_id, 0) + 1
+
+    def unpin(self, user_id: int):
+        """Release one pin; call ``trim`` once the batch is done"""
+        remaining = self._pins.get(user_id, 0) - 1
+        if remaining > 0:
+            self._pins[user_id] = remaining
+        else:
+            self._pins.pop(user_id, None)
+
+    def trim(self):
+        """Evict least recently used accounts until back under ``max_size``
+
+        Eviction stops at the first pinned account instead of scanning past
+        it, so a big batch may overshoot ``max_size`` until the flush or
+        settle that unpins it trims again.
+        """
+        while len(self._entries) > self.max_size:
+            user_id = next(iter(self._entries))
+            if user_id in self._pins:
+                break
+            del self._entries[user_id]
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "pinned": len(self._pins),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+class Ledger:
+    """Authoritative in-memory balances backed by a write-behind transaction log
+
+    Balance changes are applied to memory immediately, appended to an on-disk
+    journal and queued; the queue is group-committed to SQLite in batches.
+    Every change carries a monotonically increasing sequence number that is
+    stored on both the account row and the transaction row, which makes
+    replaying the journal after a crash idempotent.
+    """
+
+    UPSERT_ACCOUNT = """
+        INSERT INTO economy (user_id, balance, lifetime_earned, last_daily, daily_streak, ledger_seq)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET
+            balance = excluded.balance,
+            lifetime_earned = excluded.lifetime_earned,
+            last_daily = COALESCE(excluded.last_daily, economy.last_daily),
+            daily_streak = COALESCE(excluded.daily_streak, economy.daily_streak),
+            ledger_seq = excluded.ledger_seq
+        WHERE excluded.ledger_seq > economy.ledger_seq
+    """
+
+    INSERT_TRANSACTION = """
+        INSERT OR IGNORE INTO transactions
+        (seq, user_id, amount, type, reference, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """
+
+    def __init__(
+        self,
+        pool: SQLitePool,
+        journal_path: Path,
+        batch_size: int = 500,
+        cache: Optional[BalanceCache] = None,
+        write_through: bool = False
+    ):
+        self._pool = pool
+        self.journal_path = Path(journal_path)
+        self.batch_size = batch_size
+        self.accounts = cache if cache is not None else BalanceCache()
+        self.write_through = write_through  # Flush every change before returning
+        self._pending: List[Dict[str, Any]] = []  # Journaled, not yet in SQLite
+        self._undo: Dict[int, List[Tuple[int, Dict[str, Any]]]] = {}  # {id(db): [(user_id, snapshot)]}
+        self._seq = 0
+        self._journal = None
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.on_change: Optional[Callable[[int, int], None]] = None  # (user_id, balance)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def open(self):
+        """Replay any journal left behind by a crash and start a fresh one"""
+        await self._replay()
+
+        async with self._pool.acquire() as db:
+            cursor = await db.execute("SELECT MAX(seq) FROM transactions")
+            max_txn = (await cursor.fetchone())[0] or 0
+            cursor = await db.execute("SELECT MAX(ledger_seq) FROM economy")
+            max_account = (await cursor.fetchone())[0] or 0
+        self._seq = max(self._seq, max_txn, max_account)
+
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+    async def close(self):
+        """Flush everything still queued and close the journal"""
+        await self.flush()
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+
+    async def _replay(self):
+        """Apply journal entries that may not have reached SQLite"""
+        if not self.journal_path.exists():
+            return
+
+        entries = []
+        with open(self.journal_path, encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break  # Torn write at the tail, nothing after it is valid
+
+        if entries:
+            async with self._pool.transaction() as db:
+                await self._write(db, entries)
+            self._seq = max(entry["seq"] for entry in entries)
+            log.info(f"Replayed {len(entries)} economy journal entries")
+
+        self.journal_path.unlink()
+
+    async def _write(self, db: aiosqlite.Connection, entries: List[Dict[str, Any]]):
+        """Write ledger entries to SQLite inside the given transaction"""
+        # The last entry per user carries that account's final state
+        latest = {}
+        for entry in entries:
+            latest[entry["user_id"]] = entry
+
+        await db.executemany(self.UPSERT_ACCOUNT, [
+            (e["user_id"], e["balance"], e["lifetime_earned"],
+             e.get("last_daily"), e.get("daily_streak"), e["seq"])
+            for e in latest.values()
+        ])
+        await db.executemany(self.INSERT_TRANSACTION, [
+            (e["seq"], e["user_id"], e["amount"], e["type"], e["reference"], e["timestamp"])
+            for e in entries
+        ])
+
+    async def load(self, user_id: int, db: Optional[aiosqlite.Connection] = None) -> Dict[str, Any]:
+        """Get a user's account, reading it from SQLite on first use"""
+        account = self.accounts.get(user_id)
+        if account is not None:
+            return account
+
+        if db is None:
+            async with self._pool.acquire() as db:
+                return await self._fetch(user_id, db)
+        return await self._fetch(user_id, db)
+
+    async def _fetch(self, user_id: int, db: aiosqlite.Connection) -> Dict[str, Any]:
+        cursor = await db.execute(
+            """SELECT balance, lifetime_earned, last_daily, daily_streak, ledger_seq
+               FROM economy WHERE user_id = ?""",
+            (user_id,)
+        )
+        return self._cache(user_id, await cursor.fetchone())
+
+    def _cache(self, user_id: int, row: Optional[aiosqlite.Row]) -> Dict[str, Any]:
+        """Cache an account read from SQLite and report its balance to ``on_change``
+
+        Reloads after a TTL expiry are how edits made outside this process
+        show up, so the leaderboard hears about them too.
+        """
+        # Another coroutine may have loaded the account while we awaited
+        account = self.accounts.setdefault(user_id, self._account(row))
+        if row is not None and self.on_change:
+            self.on_change(user_id, account["balance"])
+        return account
+
+    @staticmethod
+    def _account(row: Optional[aiosqlite.Row]) -> Dict[str, Any]:
+        return {
+            "balance": row['balance'] if row else 0,
+            "lifetime_earned": row['lifetime_earned'] if row else 0,
+            "last_daily": row['last_daily'] if row else None,
+            "daily_streak": row['daily_streak'] if row else 0,
+            "seq": row['ledger_seq'] if row else 0
+        }
+
+    async def load_many(self, user_ids: List[int], db: aiosqlite.Connection) -> Dict[int, Dict[str, Any]]:
+        """Load several accounts with one query per chunk of cache misses"""
+        accounts = {}
+        missing = []
+        for user_id in user_ids:
+            account = self.accounts.get(user_id)
+            if account is None:
+                missing.append(user_id)
+            else:
+                accounts[user_id] = account
 
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS shop_items (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT UNIQUE,
-                    description TEXT,
-                    price INTEGER,
-                    role_id INTEGER,
-                    stock INTEGER DEFAULT -1,
-                    max_per_user INTEGER DEFAULT 1
-                )
-            """)
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            cursor = await db.execute(
+                f"""SELECT user_id, balance, lifetime_earned, last_daily, daily_streak, ledger_seq
+                    FROM economy WHERE user_id IN ({', '.join('?' * len(chunk))})""",
+                chunk
+            )
+            rows = {row['user_id']: row for row in await cursor.fetchall()}
+            for user_id in chunk:
+                accounts[user_id] = self._cache(user_id, rows.get(user_id))
+        return accounts
+
+    async def apply(
+        self,
+        user_id: int,
+        amount: int,
+        transaction_type: str,
+        reference: str = "",
+        db: Optional[aiosqlite.Connection] = None,
+        updates: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """Apply a balance change and return the new balance
+
+        Without ``db`` the change is journaled and queued for the next group
+        commit. With ``db`` it is written through inside the caller's
+        transaction and reverted in memory if that transaction rolls back.
+        ``updates`` sets other account columns (e.g. the daily streak) in the
+        same write as the balance.
+        """
+        account = await self.load(user_id, db)
+        self.accounts.pin(user_id)  # Unpinned once SQLite has the change
+        entry = self._change(user_id, account, amount, transaction_type, reference, updates, db)
+
+        if db is not None:
+            await self._write(db, [entry])
+        else:
+            self._journal.write(json.dumps(entry) + "\n")
+            self._journal.flush()
+            self._pending.append(entry)
+            if self.write_through:
+                await self.flush()
+            elif len(self._pending) >= self.batch_size and not self._flush_lock.locked():
+                self._flush_task = asyncio.create_task(self.flush())
+                self._flush_task.add_done_callback(self._flush_done)
+
+        return account["balance"]
+
+    async def apply_many(
+        self,
+        changes: List[Tuple[int, int, str, str]],
+        db: aiosqlite.Connection
+    ) -> Dict[int, int]:
+        """Apply (user_id, amount, type, reference) changes with a single write
+
+        Always written through inside the caller's transaction, which must
+        hold the stripes of every user involved. Returns each user's final
+        balance.
+        """
+        user_ids = list(dict.fromkeys(user_id for user_id, *_ in changes))
+
+        # Pin before loading so a batch larger than the cache can't evict itself
+        for user_id, *_ in changes:
+            self.accounts.pin(user_id)
+        try:
+            accounts = await self.load_many(user_ids, db)
+        except BaseException:
+            for user_id, *_ in changes:
+                self.accounts.unpin(user_id)
+            self.accounts.trim()
+            raise
+
+        entries = [
+            self._change(user_id, accounts[user_id], amount, transaction_type, reference, None, db)
+            for user_id, amount, transaction_type, reference in changes
+        ]
+        await self._write(db, entries)
+        return {user_id: accounts[user_id]["balance"] for user_id in user_ids}
+
+    def _change(
+        self,
+        user_id: int,
+        account: Dict[str, Any],
+        amount: int,
+        transaction_type: str,
+        reference: str,
+        updates: Optional[Dict[str, Any]],
+        db: Optional[aiosqlite.Connection]
+    ) -> Dict[str, Any]:
+        """Mutate a loaded account in memory and build its ledger entry"""
+        if db is not None:
+            self._undo.setdefault(id(db), []).append((user_id, dict(account)))
+
+        if updates:
+            account.update(updates)
+        account["balance"] = max(account["balance"] + amount, 0)  # Prevent negative balance
+        account["lifetime_earned"] += max(amount, 0)
+        self._seq += 1
+        account["seq"] = self._seq
+        if self.on_change:
+            self.on_change(user_id, account["balance"])
+
+        return {
+            "seq": self._seq,
+            "user_id": user_id,
+            "amount": amount,
+            "type": transaction_type,
+            "reference": reference,
+            "timestamp": datetime.utcnow().isoformat(),
+            "balance": account["balance"],
+            "lifetime_earned": account["lifetime_earned"],
+            "last_daily": account["last_daily"],
+            "daily_streak": account["daily_streak"]
+        }
+
+    def settle(self, db: aiosqlite.Connection, committed: bool):
+        """Keep or revert the in-memory side of changes written through ``db``"""
+        changes = self._undo.pop(id(db), [])
+        if not committed:
+            for user_id, snapshot in reversed(changes):
+                self.accounts.put(user_id, snapshot)
+                if self.on_change:
+                    self.on_change(user_id, snapshot["balance"])
+
+        for user_id, _ in changes:
+            self.accounts.unpin(user_id)
+        self.accounts.trim()
+
+    @staticmethod
+    def _flush_done(task: asyncio.Task):
+        # Nobody awaits a size-triggered flush; its entries stay queued for the next one
+        if not task.cancelled() and task.exception():
+            log.error(f"Background economy ledger flush failed: {task.exception()}")
+
+    async def flush(self) -> int:
+        """Group-commit queued entries to SQLite"""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            batch, self._pending = self._pending, []
+            try:
+                async with self._pool.transaction() as db:
+                    await self._write(db, batch)
+            except BaseException:
+                self._pending[:0] = batch  # Retry on the next flush
+                raise
 
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS user_inventory (
-                    user_id INTEGER,
-                    item_id INTEGER,
-                    quantity INTEGER DEFAULT 1,
-                    purchased_at TEXT,
-                    PRIMARY KEY (user_id, item_id)
+            for entry in batch:
+                self.accounts.unpin(entry["user_id"])
+            self.accounts.trim()
+
+            # The journal only needs to hold what SQLite doesn't have yet
+            if self._journal:
+                self._rewrite_journal()
+
+            return len(batch)
+
+    def _rewrite_journal(self):
+        """Swap the journal for one holding only the pending entries
+
+        The new file is written and fsynced beside the old one and renamed
+        over it, so a crash at any point leaves one complete journal. This
+        runs without awaiting, so no entry can be appended to the old file
+        in the meantime.
+        """
+        partial = self.journal_path.with_name(self.journal_path.name + ".partial")
+        with open(partial, "w", encoding="utf-8") as journal:
+            for entry in self._pending:
+                journal.write(json.dumps(entry) + "\n")
+            journal.flush()
+            if self._pending:
+                os.fsync(journal.fileno())
+        os.replace(partial, self.journal_path)
+
+        self._journal.close()
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+    async def sync_journal(self):
+        """Force journaled entries to stable storage"""
+        # Under the flush lock, so a flush can't swap the file out from under the fsync
+        async with self._flush_lock:
+            if self._journal and self._pending:
+                await asyncio.to_thread(os.fsync, self._journal.fileno())
+
+class LedgerArchive:
+    """Compacts old transactions into daily summaries and monthly archives
+
+    Rows older than the horizon are appended to gzipped JSONL files, one per
+    month, and then replaced in SQLite by per-user daily summaries. The
+    archive is written and synced before the rows are deleted, so a crash in
+    between can only archive a row twice; readers drop duplicates by id.
+    """
+
+    UPSERT_SUMMARY = """
+        INSERT INTO transaction_summaries (user_id, day, type, count, total)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(user_id, day, type) DO UPDATE SET
+            count = count + excluded.count,
+            total = total + excluded.total
+    """
+
+    def __init__(self, pool: SQLitePool, archive_dir: Path, horizon_days: int = 90, batch_size: int = 5000):
+        self._pool = pool
+        self.archive_dir = Path(archive_dir)
+        self.horizon_days = horizon_days
+        self.batch_size = batch_size
+        self.last_compacted = 0
+        self.last_run: Optional[datetime] = None
+
+    def _path(self, month: str) -> Path:
+        return self.archive_dir / f"transactions-{month}.jsonl.gz"
+
+    def months(self) -> List[str]:
+        """Archived months (YYYY-MM), newest first"""
+        if not self.archive_dir.exists():
+            return []
+        return sorted(
+            (path.name[len("transactions-"):-len(".jsonl.gz")] for path in self.archive_dir.glob("transactions-*.jsonl.gz")),
+            reverse=True
+        )
+
+    async def compact(self) -> int:
+        """Archive everything past the horizon, one batch per transaction"""
+        cutoff = (datetime.utcnow() - timedelta(days=self.horizon_days)).isoformat()
+        compacted = 0
+
+        while True:
+            async with self._pool.acquire() as db:
+                cursor = await db.execute(
+                    """SELECT id, seq, user_id, amount, type, reference, timestamp
+                       FROM transactions WHERE timestamp < ?
+                       ORDER BY timestamp LIMIT ?""",
+                    (cutoff, self.batch_size)
                 )
+                rows = [dict(row) for row in await cursor.fetchall()]
+
+            if not rows:
+                break
+
+            await asyncio.to_thread(self._append, rows)
+
+            summaries = {}
+            for row in rows:
+                key = (row["user_id"], row["timestamp"][:10], row["type"])
+                count, total = summaries.get(key, (0, 0))
+                summaries[key] = (count + 1, total + (row["amount"] or 0))
+
+            async with self._pool.transaction() as db:
+                await db.executemany(self.UPSERT_SUMMARY, [
+                    (user_id, day, type_, count, total)
+                    for (user_id, day, type_), (count, total) in summaries.items()
+                ])
+                await db.executemany("DELETE FROM transactions WHERE id = ?", [(row["id"],) for row in rows])
+
+            compacted += len(rows)
+            if len(rows) < self.batch_size:
+                break
+
+        self.last_compacted = compacted
+        self.last_run = datetime.utcnow()
+        if compacted:
+            log.info(f"Archived {compacted} economy transactions older than {cutoff}")
+        return compacted
+
+    def _append(self, rows: List[Dict[str, Any]]):
+        """Append rows to their monthly archives and sync them to disk"""
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        by_month: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_month.setdefault(row["timestamp"][:7], []).append(row)
+
+        for month, month_rows in by_month.items():
+            # Each append is its own gzip member; gzip readers stream across them
+            with open(self._path(month), "ab") as raw:
+                with gzip.GzipFile(fileobj=raw, mode="ab") as archive:
+                    for row in month_rows:
+                        archive.write((json.dumps(row) + "\n").encode("utf-8"))
+                raw.flush()
+                os.fsync(raw.fileno())
+
+    async def history(self, user_id: int, month: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """Newest archived transactions for a user, optionally within one month"""
+        return await asyncio.to_thread(self._read, user_id, month, limit)
+
+    def _read(self, user_id: int, month: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        found: List[Dict[str, Any]] = []
+        for name in ([month] if month else self.months()):
+            path = self._path(name)
+            if not path.exists():
+                continue
+
+            rows = {}
+            with gzip.open(path, "rt", encoding="utf-8") as archive:
+                for line in archive:
+                    row = json.loads(line)
+                    if row["user_id"] == user_id:
+                        rows[row["id"]] = row
+            found.extend(sorted(rows.values(), key=lambda row: row["timestamp"], reverse=True))
+
+            # Months are scanned newest first, so older ones can't displace these
+            if len(found) >= limit:
+                break
+        return found[:limit]
+
+    async def summaries(self, user_id: int, month: Optional[str] = None) -> List[aiosqlite.Row]:
+        """Compacted per-type totals for a user, optionally within one month"""
+        async with self._pool.acquire() as db:
+            cursor = await db.execute(
+                """SELECT type, SUM(count) as count, SUM(total) as total,
+                          MIN(day) as first_day, MAX(day) as last_day
+                   FROM transaction_summaries
+                   WHERE user_id = ? AND day LIKE ?
+                   GROUP BY type ORDER BY type""",
+                (user_id, f"{month}-%" if month else "%")
+            )
+            return await cursor.fetchall()
+
+class ShopCatalog:
+    """In-memory copy of shop_items with prebuilt, versioned shop pages
+
+    SQLite stays the source of truth; the catalog is loaded once and then
+    kept in step by the admin commands and purchases, each of which bumps
+    ``version`` so the page embeds are rebuilt on the next /shop.
+    """
+
+    PAGE_SIZE = 6
+
+    def __init__(self, pool: SQLitePool, currency_emoji: str, owned_cache_size: int = 10000):
+        self._pool = pool
+        self.currency_emoji = currency_emoji
+        self.items: Dict[int, Dict[str, Any]] = {}  # {item_id: item}
+        self.version = 0
+        self._pages: List[discord.Embed] = []
+        self._pages_version = -1
+        # {user_id: {item_id: quantity}}, only ever changed by /buy
+        self.owned = BalanceCache(owned_cache_size, ttl=0)
+
+    async def load(self):
+        """Read the whole catalog, with how many members own each item"""
+        async with self._pool.acquire() as db:
+            cursor = await db.execute("""
+                SELECT
+                    id, name, description, price, role_id, stock, max_per_user,
+                    (SELECT COUNT(*) FROM user_inventory WHERE item_id = shop_items.id) as purchasers
+                FROM shop_items
             """)
+            self.items = {row['id']: dict(row) for row in await cursor.fetchall()}
+        self.version += 1
+
+    def add(self, item: Dict[str, Any]):
+        self.items[item['id']] = dict(item, purchasers=0)
+        self.version += 1
+
+    def remove(self, item_id: int) -> Optional[Dict[str, Any]]:
+        item = self.items.pop(item_id, None)
+        self.version += 1
+        return item
+
+    def sorted_items(self) -> List[Dict[str, Any]]:
+        return sorted(self.items.values(), key=lambda item: (item['price'], item['id']))
+
+    @property
+    def page_count(self) -> int:
+        return max(1, (len(self.items) - 1) // self.PAGE_SIZE + 1)
+
+    def page(self, page: int) -> discord.Embed:
+        """Shared embed for one shop page, rebuilt only when the catalog changed"""
+        if self._pages_version != self.version:
+            self._pages = self._build_pages()
+            self._pages_version = self.version
+        return self._pages[max(0, min(page, len(self._pages) - 1))]
+
+    def _build_pages(self) -> List[discord.Embed]:
+        items = self.sorted_items()
+        pages = []
+        for start in range(0, max(len(items), 1), self.PAGE_SIZE):
+            embed = discord.Embed(
+                title="🛍️ Crystal Shop",
+                description="Use `/buy <item_id>` to purchase an item",
+                color=0x9B59B6
+            )
+
+            for item in items[start:start + self.PAGE_SIZE]:
+                # Build item info
+                info = f"**Price:** {item['price']:,} {self.currency_emoji}\n"
 
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS transactions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER,
-                    amount INTEGER,
-                    type TEXT,
-                    reference TEXT,
-                    timestamp TEXT
+                # Show stock info
+                if item['stock'] > 0:
+                    info += f"**In Stock:** {item['stock']:,}\n"
+                elif item['stock'] == 0:
+                    info += "**Out of Stock**\n"
+
+                # Show purchase limit
+                if item['max_per_user'] > 0:
+                    info += f"**Limit:** {item['max_per_user']} per member\n"
+
+                # Add description if available
+                if item['description']:
+                    info += f"\n{item['description']}"
+
+                embed.add_field(
+                    name=f"#{item['id']} - {item['name']}",
+                    value=info,
+                    inline=False
                 )
-            """)
 
+            if len(items) > self.PAGE_SIZE:
+                embed.set_footer(text=f"Page {start // self.PAGE_SIZE + 1}/{self.page_count}")
+            pages.append(embed)
+        return pages
+
+    async def owned_by(self, user_id: int) -> Dict[int, int]:
+        """A member's item quantities, read from SQLite once and then kept current"""
+        owned = self.owned.get(user_id)
+        if owned is not None:
+            return owned
+
+        async with self._pool.acquire() as db:
+            cursor = await db.execute(
+                "SELECT item_id, quantity FROM user_inventory WHERE user_id = ?",
+                (user_id,)
+            )
+            loaded = {row['item_id']: row['quantity'] for row in await cursor.fetchall()}
+        return self.owned.setdefault(user_id, loaded)
+
+    def reserve(self, item_id: int) -> bool:
+        """Take one unit of stock in memory; there is no await between check and decrement"""
+        item = self.items.get(item_id)
+        if item is None or item['stock'] == 0:
+            return False
+        if item['stock'] > 0:
+            item['stock'] -= 1
+            self.version += 1
+        return True
+
+    def release(self, item_id: int):
+        """Give back a reserved unit when the purchase didn't commit"""
+        item = self.items.get(item_id)
+        if item is not None and item['stock'] >= 0:
+            item['stock'] += 1
+            self.version += 1
+
+    def sold_out(self, item_id: int):
+        """SQLite had less stock than memory; trust SQLite"""
+        item = self.items.get(item_id)
+        if item is not None:
+            item['stock'] = 0
+            self.version += 1
+
+    def confirm(self, user_id: int, item_id: int, remaining: int, quantity: int):
+        """Reconcile memory with what the purchase's transaction returned"""
+        item = self.items.get(item_id)
+        if item is not None:
+            if remaining >= 0 and remaining < item['stock']:
+                item['stock'] = remaining
+                self.version += 1
+            if quantity == 1:
+                item['purchasers'] += 1
+
+        owned = self.owned.get(user_id)
+        if owned is not None:
+            owned[item_id] = quantity
+
+class RoleGrantQueue:
+    """Grants purchased roles after the purchase has committed
+
+    Purchases never wait on Discord; a failed grant is logged, the member
+    keeps the item and a Warlock can hand the role out by hand.
+    """
+
+    def __init__(self, workers: int = 2):
+        self.workers = workers
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self.granted = 0
+        self.failed = 0
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 10.0):
+        """Give queued grants a moment to finish, then stop the workers"""
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            log.warning(f"Dropping {self.depth} queued role grants on shutdown")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def put(self, member: discord.Member, role: discord.Role, reason: str):
+        self._queue.put_nowait((member, role, reason))
+
+    async def _work(self):
+        while True:
+            member, role, reason = await self._queue.get()
+            try:
+                await member.add_roles(role, reason=reason)
+                self.granted += 1
+            except discord.Forbidden:
+                self.failed += 1
+                log.warning(f"Missing permissions to give {role} to {member} ({reason})")
+            except Exception as e:
+                self.failed += 1
+                log.error(f"Failed to give {role} to {member} ({reason}): {e}")
+            finally:
+                self._queue.task_done()
+
+class Leaderboard:
+    """Order-statistics index over balances for O(log n) rank and page lookups
+
+    Balances are grouped into log-linear buckets (exact below 64, then 32
+    sub-buckets per power of two). A Fenwick tree counts members per bucket
+    and each bucket keeps its own sorted list, so a rank is one prefix sum
+    plus one bisect in a small list.
+    """
+
+    SUB_BUCKETS = 32
+    BUCKETS = 64 + 58 * SUB_BUCKETS  # Enough for any 63-bit balance
+
+    def __init__(self):
+        self._balances: Dict[int, int] = {}  # {user_id: balance}
+        self._tree = [0] * (self.BUCKETS + 1)  # Fenwick tree, 1-indexed
+        self._buckets: List[List[Tuple[int, int]]] = [[] for _ in range(self.BUCKETS)]
+
+    def __len__(self) -> int:
+        return len(self._balances)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._balances
+
+    @classmethod
+    def _bucket(cls, balance: int) -> int:
+        if balance < 2 * cls.SUB_BUCKETS:
+            return max(balance, 0)
+        shift = balance.bit_length() - 6
+        return min(
+            2 * cls.SUB_BUCKETS + (shift - 1) * cls.SUB_BUCKETS + (balance >> shift) - cls.SUB_BUCKETS,
+            cls.BUCKETS - 1
+        )
+
+    def _add(self, bucket: int, delta: int):
+        index = bucket + 1
+        while index <= self.BUCKETS:
+            self._tree[index] += delta
+            index += index & -index
+
+    def _prefix(self, bucket: int) -> int:
+        """Number of members in buckets 0..bucket"""
+        total = 0
+        index = bucket + 1
+        while index > 0:
+            total += self._tree[index]
+            index -= index & -index
+        return total
+
+    def _find(self, k: int) -> int:
+        """Lowest bucket whose prefix count reaches k (1-based)"""
+        index = 0
+        step = 1 << self.BUCKETS.bit_length()
+        while step:
+            nxt = index + step
+            if nxt <= self.BUCKETS and self._tree[nxt] < k:
+                index = nxt
+                k -= self._tree[nxt]
+            step >>= 1
+        return index  # Converted back to a 0-based bucket
+
+    def update(self, user_id: int, balance: int):
+        """Insert a member or move them to a new balance"""
+        old = self._balances.get(user_id)
+        if old == balance:
+            return
+        if old is not None:
+            self.remove(user_id)
+
+        bucket = self._bucket(balance)
+        bisect.insort(self._buckets[bucket], (balance, user_id))
+        self._add(bucket, 1)
+        self._balances[user_id] = balance
+
+    def remove(self, user_id: int):
+        balance = self._balances.pop(user_id, None)
+        if balance is None:
+            return
+
+        bucket = self._bucket(balance)
+        entries = self._buckets[bucket]
+        del entries[bisect.bisect_left(entries, (balance, user_id))]
+        self._add(bucket, -1)
+
+    def rank(self, balance: int) -> int:
+        """1-based rank of a balance: one more than the members strictly above it"""
+        bucket = self._bucket(balance)
+        entries = self._buckets[bucket]
+        above_bucket = len(self._balances) - self._prefix(bucket)
+        in_bucket = len(entries) - bisect.bisect_right(entries, (balance, float("inf")))
+        return above_bucket + in_bucket + 1
+
+    def page(self, offset: int, limit: int) -> List[Tuple[int, int]]:
+        """(user_id, balance) pairs from the richest down, starting at ``offset``"""
+        total = len(self._balances)
+        offset = max(offset, 0)
+        if offset >= total or limit <= 0:
+            return []
+
+        # Position of the first wanted member counted from the poorest
+        k = total - offset
+        bucket = self._find(k)
+        position = k - (self._prefix(bucket - 1) if bucket else 0) - 1
+
+        results = []
+        while bucket >= 0 and len(results) < limit:
+            entries = self._buckets[bucket]
+            while position >= 0 and len(results) < limit:
+                balance, user_id = entries[position]
+                results.append((user_id, balance))
+                position -= 1
+            bucket -= 1
+            if bucket >= 0:
+                position = len(self._buckets[bucket]) - 1
+        return results
+
+class StripedLock:
+    """Fixed set of asyncio locks keyed by user id, with per-stripe contention stats"""
+
+    def __init__(self, stripes: int = 64):
+        self._locks = [asyncio.Lock() for _ in range(stripes)]
+        self.acquisitions = [0] * stripes
+        self.contended = [0] * stripes
+        self.wait_time = [0.0] * stripes
+        self.max_wait = [0.0] * stripes
+
+    @property
+    def held(self) -> bool:
+        return any(lock.locked() for lock in self._locks)
+
+    def stripe(self, key: int) -> int:
+        return hash(key) % len(self._locks)
+
+    @asynccontextmanager
+    async def hold(self, *keys: int):
+        """Hold the stripes for every key, acquired in index order to avoid deadlocks"""
+        acquired = []
+        try:
+            for index in sorted({self.stripe(key) for key in keys}):
+                lock = self._locks[index]
+                if lock.locked():
+                    self.contended[index] += 1
+
+                start = time.perf_counter()
+                await lock.acquire()
+                acquired.append(lock)
+
+                waited = time.perf_counter() - start
+                self.acquisitions[index] += 1
+                self.wait_time[index] += waited
+                self.max_wait[index] = max(self.max_wait[index], waited)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
+
+    def stats(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Most contended stripes by total wait time"""
+        rows = [
+            {
+                "stripe": index,
+                "acquisitions": self.acquisitions[index],
+                "contended": self.contended[index],
+                "wait_time": self.wait_time[index],
+                "max_wait": self.max_wait[index]
+            }
+            for index in range(len(self._locks))
+            if self.acquisitions[index]
+        ]
+        rows.sort(key=lambda row: row["wait_time"], reverse=True)
+        return rows[:limit]
+
+def parse_balances(data: bytes, filename: str) -> Dict[int, int]:
+    """Read {user_id: balance} from a CSV (with a header row) or JSONL export
+
+    Both formats need ``user_id`` and ``balance`` fields; later rows for the
+    same member win.
+    """
+    text = data.decode("utf-8-sig")
+    if filename.lower().endswith((".jsonl", ".json", ".ndjson")):
+        rows = ((number, json.loads(line)) for number, line in enumerate(text.splitlines(), 1) if line.strip())
+    else:
+        rows = enumerate(csv.DictReader(io.StringIO(text)), 2)
+
+    balances = {}
+    for number, row in rows:
+        try:
+            user_id, balance = int(row["user_id"]), int(row["balance"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"line {number} needs integer user_id and balance fields")
+        if balance < 0:
+            raise ValueError(f"line {number} has a negative balance")
+        balances[user_id] = balance
+    return balances
+
+class GuildEconomy:
+    """One guild's economy: its own SQLite file, ledger, shop and leaderboard
+
+    Guilds share nothing, so a busy guild never contends with a quiet one
+    and each database file can be backed up or moved on its own.
+    """
+
+    def __init__(self, guild_id: int, db_path: Path, archive_dir: Path, currency_emoji: str):
+        self.guild_id = guild_id
+        self.db_path = Path(db_path)
+        self.last_used = time.monotonic()
+
+        # Connection pool, ledger and locks; two connections is plenty for
+        # one guild and keeps the thread count down with many guilds open
+        self.pool = SQLitePool(self.db_path, size=2)
+        self.ledger = Ledger(
+            self.pool,
+            self.db_path.with_suffix(".journal"),
+            batch_size=ECONOMY_FLUSH_BATCH_SIZE,
+            cache=BalanceCache(ECONOMY_CACHE_SIZE, ECONOMY_CACHE_TTL),
+            write_through=ECONOMY_CACHE_WRITE_THROUGH
+        )
+        self.locks = StripedLock()
+        self.leaderboard = Leaderboard()
+        self.ledger.on_change = self.leaderboard.update
+        self.catalog = ShopCatalog(self.pool, currency_emoji, ECONOMY_CACHE_SIZE)
+        self.archive = LedgerArchive(self.pool, archive_dir, ECONOMY_ARCHIVE_AFTER_DAYS)
+
+    async def open(self):
+        """Open the connection pool, initialize the database and replay the ledger"""
+        await self.pool.open()
+        await self._init_db()
+        await self.catalog.load()
+        await self.ledger.open()
+        await self._load_leaderboard()
+
+    async def close(self):
+        """Flush the ledger and close the connection pool"""
+        await self.ledger.close()
+        await self.pool.close()
+
+    def touch(self):
+        self.last_used = time.monotonic()
+
+    @property
+    def busy(self) -> bool:
+        """Whether closing now could cut off work in progress"""
+        return bool(self.pool.in_use or self.ledger.pending or self.locks.held)
+
+    async def _load_leaderboard(self):
+        """Build the in-memory leaderboard with one pass over the economy table"""
+        async with self.read_db() as db:
+            async with db.execute("SELECT user_id, balance FROM economy") as cursor:
+                async for row in cursor:
+                    self.leaderboard.update(row['user_id'], row['balance'] or 0)
+
+    async def _init_db(self):
+        """Bring the schema up to date and seed the shop"""
+        await self.pool.migrate(MIGRATIONS)
+
+        async with self.get_db() as db:
             # Add default items if shop is empty
             cursor = await db.execute("SELECT COUNT(*) FROM shop_items")
             if (await cursor.fetchone())[0] == 0:
@@ -87,109 +1193,252 @@ class Economy(commands.Cog):
                     default_items
                 )
 
-            await db.commit()
-
     @asynccontextmanager
     async def get_db(self) -> AsyncGenerator[aiosqlite.Connection, None]:
-        """Async context manager for database connections"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            try:
+        """Pooled connection inside a write transaction, committed on exit"""
+        db = None
+        try:
+            async with self.pool.transaction() as db:
                 yield db
-                await db.commit()
-            except Exception:
-                await db.rollback()
-                raise
-
-    async def _get_balance(self, user_id: int) -> int:
-        """Get user's balance with cache support"""
-        if user_id in self._balance_cache:
-            return self._balance_cache[user_id]
+        except BaseException:
+            if db is not None:
+                self.ledger.settle(db, committed=False)
+            raise
+        self.ledger.settle(db, committed=True)
 
-        async with self.get_db() as db:
-            await db.execute(
-                "INSERT OR IGNORE INTO economy (user_id, balance) VALUES (?, 0)",
-                (user_id,)
-            )
-            cursor = await db.execute(
-                "SELECT balance FROM economy WHERE user_id = ?",
-                (user_id,)
-            )
-            row = await cursor.fetchone()
-            balance = row['balance'] if row else 0
+    @asynccontextmanager
+    async def read_db(self) -> AsyncGenerator[aiosqlite.Connection, None]:
+        """Pooled connection for read-only queries"""
+        async with self.pool.acquire() as db:
+            yield db
 
-        self._balance_cache[user_id] = balance
-        return balance
+    async def get_balance(self, user_id: int, db: Optional[aiosqlite.Connection] = None) -> int:
+        """Get user's balance from the ledger, optionally inside the caller's transaction"""
+        account = await self.ledger.load(user_id, db)
+        return account["balance"]
 
-    async def _update_balance(
+    async def update_balance(
         self,
         user_id: int,
         amount: int,
         transaction_type: str,
-        reference: str = ""
+        reference: str = "",
+        db: Optional[aiosqlite.Connection] = None
     ) -> int:
-        """Update user's balance atomically"""
-        async with self._db_lock, self.get_db() as db:
-            # Get current balance
-            cursor = await db.execute(
-                "SELECT balance, lifetime_earned FROM economy WHERE user_id = ?",
-                (user_id,)
-            )
-            result = await cursor.fetchone()
-
-            if not result:  # User doesn't exist yet
-                new_balance = max(amount, 0)  # Prevent negative balance for new users
-                lifetime = max(amount, 0)
-                await db.execute(
-                    "INSERT INTO economy (user_id, balance, lifetime_earned) VALUES (?, ?, ?)",
-                    (user_id, new_balance, lifetime)
-                )
+        """Update user's balance atomically
+
+        Without ``db`` the change is queued on the write-behind ledger. When
+        ``db`` is given the update joins the caller's transaction and the
+        caller is expected to already hold the user's stripe in ``locks``.
+        """
+        if db is None:
+            async with self.locks.hold(user_id):
+                return await self.ledger.apply(user_id, amount, transaction_type, reference)
+
+        return await self.ledger.apply(user_id, amount, transaction_type, reference, db)
+
+    async def apply_deltas(self, deltas: List[Tuple[int, int, str, str]]) -> Dict[int, int]:
+        """Apply many (user_id, amount, type, reference) changes in one transaction
+
+        Returns every touched user's new balance. Either all of the changes
+        commit or none do.
+        """
+        if not deltas:
+            return {}
+
+        async with self.locks.hold(*{user_id for user_id, *_ in deltas}), self.get_db() as db:
+            return await self.ledger.apply_many(deltas, db)
+
+    async def import_balances(self, balances: Dict[int, int], reference: str, replace: bool = True) -> int:
+        """Set (or add to) many balances in one transaction, returning the net change
+
+        Each member gets one ``import`` transaction for the difference, so
+        imported crystals show up in the ledger like any other change.
+        """
+        if not balances:
+            return 0
+
+        async with self.locks.hold(*balances), self.get_db() as db:
+            if replace:
+                accounts = await self.ledger.load_many(list(balances), db)
+                deltas = [
+                    (user_id, balance - accounts[user_id]["balance"], "import", reference)
+                    for user_id, balance in balances.items()
+                ]
             else:
-                current_balance = result['balance']
-                new_balance = max(current_balance + amount, 0)  # Prevent negative balance
-                lifetime = result['lifetime_earned'] + max(amount, 0)
+                deltas = [(user_id, balance, "import", reference) for user_id, balance in balances.items()]
+
+            deltas = [delta for delta in deltas if delta[1]]
+            await self.ledger.apply_many(deltas, db)
+        return sum(amount for _, amount, *_ in deltas)
+
+    async def snapshot(self, target: Path) -> int:
+        """Write a consistent copy of the database to ``target``, returning its size
+
+        Uses SQLite's online backup API from a pooled reader. The copy is
+        made in a single step: in WAL mode that read transaction never
+        blocks writers, whereas a paced multi-step backup restarts every
+        time the ledger commits underneath it.
+        """
+        # Queued ledger entries belong in the snapshot too
+        await self.ledger.flush()
+
+        target = Path(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(target.name + ".partial")
+        async with self.read_db() as db:
+            async with aiosqlite.connect(partial) as copy:
+                await db.backup(copy)
+        os.replace(partial, target)
+        return target.stat().st_size
 
-                # Update balance
-                await db.execute(
-                    """UPDATE economy 
-                        SET balance = ?, 
-                            lifetime_earned = ? 
-                        WHERE user_id = ?""",
-                    (new_balance, lifetime, user_id)
-                )
+class Economy(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.data_dir = Path("data/economy")
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.archive_dir = Path(ECONOMY_ARCHIVE_DIR)
+        self.currency_name = "crystals"
+        self.currency_emoji = "💎"
 
-            # Log transaction
-            await db.execute(
-                """INSERT INTO transactions 
-                    (user_id, amount, type, reference, timestamp)
-                    VALUES (?, ?, ?, ?, ?)""",
-                (user_id, amount, transaction_type, reference, 
-                 datetime.utcnow().isoformat())
+        # Guild economies are opened on first use and closed when idle
+        self._guilds: Dict[int, GuildEconomy] = {}
+        self._opening: Dict[int, asyncio.Lock] = {}
+        self.role_grants = RoleGrantQueue()
+        self.flush_ledger.change_interval(seconds=max(ECONOMY_DURABILITY_WINDOW_MS, 50) / 1000)
+        self.compact_ledger.change_interval(hours=max(ECONOMY_COMPACT_INTERVAL_HOURS, 1))
+
+    async def cog_load(self):
+        """Start the background ledger tasks; guild databases open lazily"""
+        if LEGACY_DB.exists() and not ECONOMY_LEGACY_GUILD_ID:
+            log.warning(
+                f"{LEGACY_DB} will only be adopted if the bot is in exactly one guild; "
+                "set ECONOMY_LEGACY_GUILD_ID to choose the guild that inherits it"
             )
-
-            # Update cache
-            self._balance_cache[user_id] = new_balance
-            return new_balance
+        self.role_grants.start()
+        self.flush_ledger.start()
+        self.compact_ledger.start()
+        self.close_idle_economies.start()
+
+    async def cog_unload(self):
+        """Flush every ledger and close every guild database"""
+        self.flush_ledger.cancel()
+        self.compact_ledger.cancel()
+        self.close_idle_economies.cancel()
+        await self.role_grants.stop()
+        for guild_id in list(self._guilds):
+            await self._guilds.pop(guild_id).close()
+
+    async def cog_check(self, ctx) -> bool:
+        # Every economy lives inside a guild
+        if ctx.guild is None:
+            raise commands.NoPrivateMessage()
+        return True
+
+    async def economy(self, guild_id: int) -> GuildEconomy:
+        """The guild's economy, opening its database on first use"""
+        economy = self._guilds.get(guild_id)
+        if economy is None:
+            async with self._opening.setdefault(guild_id, asyncio.Lock()):
+                economy = self._guilds.get(guild_id)
+                if economy is None:
+                    db_path = self.data_dir / f"{guild_id}.db"
+                    archive_dir = self.archive_dir / str(guild_id)
+                    if LEGACY_DB.exists() and guild_id == self._legacy_guild_id():
+                        self._adopt_legacy(db_path, archive_dir)
+
+                    economy = GuildEconomy(guild_id, db_path, archive_dir, self.currency_emoji)
+                    await economy.open()
+                    self._guilds[guild_id] = economy
+                    log.info(f"Opened economy for guild {guild_id}")
+
+        economy.touch()
+        return economy
+
+    def _legacy_guild_id(self) -> int:
+        """Guild that inherits the old economy.db: the configured one, or the bot's only guild"""
+        if ECONOMY_LEGACY_GUILD_ID:
+            return ECONOMY_LEGACY_GUILD_ID
+        guilds = self.bot.guilds
+        return guilds[0].id if len(guilds) == 1 else 0
+
+    def _adopt_legacy(self, db_path: Path, archive_dir: Path):
+        """Move the old bot-wide economy.db (and its archives) to this guild"""
+        if db_path.exists() or not LEGACY_DB.exists():
+            return
+
+        # The WAL, shared memory and journal follow the database's name
+        for suffix in ("", "-wal", "-shm"):
+            source = Path(f"{LEGACY_DB}{suffix}")
+            if source.exists():
+                os.replace(source, f"{db_path}{suffix}")
+        if LEGACY_DB.with_suffix(".journal").exists():
+            os.replace(LEGACY_DB.with_suffix(".journal"), db_path.with_suffix(".journal"))
+
+        for archive in self.archive_dir.glob("transactions-*.jsonl.gz"):
+            archive_dir.mkdir(parents=True, exist_ok=True)
+            os.replace(archive, archive_dir / archive.name)
+
+        log.info(f"Adopted legacy economy.db as {db_path}")
+
+    async def apply_deltas(self, guild_id: int, deltas: List[Tuple[int, int, str, str]]) -> Dict[int, int]:
+        """Apply many (user_id, amount, type, reference) changes to one guild in one transaction"""
+        economy = await self.economy(guild_id)
+        return await economy.apply_deltas(deltas)
+
+    @tasks.loop(seconds=1)
+    async def flush_ledger(self):
+        """Group-commit queued ledger entries once per durability window"""
+        for economy in list(self._guilds.values()):
+            try:
+                await economy.ledger.sync_journal()
+                await economy.ledger.flush()
+            except Exception as e:
+                log.error(f"Failed to flush economy ledger for guild {economy.guild_id}: {e}")
+
+    @tasks.loop(hours=6)
+    async def compact_ledger(self):
+        """Move transactions past the retention horizon into the archive"""
+        for economy in list(self._guilds.values()):
+            try:
+                await economy.archive.compact()
+            except Exception as e:
+                log.error(f"Failed to compact economy transactions for guild {economy.guild_id}: {e}")
+
+    @tasks.loop(minutes=1)
+    async def close_idle_economies(self):
+        """Close guild databases nobody has used for a while"""
+        cutoff = time.monotonic() - ECONOMY_IDLE_MINUTES * 60
+        for guild_id, economy in list(self._guilds.items()):
+            if economy.last_used > cutoff or economy.busy:
+                continue
+
+            async with self._opening.setdefault(guild_id, asyncio.Lock()):
+                # Re-check: a command may have picked it up while we waited
+                if economy.last_used > cutoff or economy.busy:
+                    continue
+                # Unlist it before closing so commands wait on the lock and open a fresh one
+                del self._guilds[guild_id]
+                try:
+                    await economy.close()
+                except Exception as e:
+                    log.error(f"Failed to close economy for guild {guild_id}: {e}")
+                    if economy.ledger.pending:
+                        # The flush failed and its journal is still open; keep it and retry later
+                        self._guilds[guild_id] = economy
+                    continue
+                log.info(f"Closed idle economy for guild {guild_id}")
 
     @commands.hybrid_command()
     async def balance(self, ctx, user: Optional[discord.Member] = None):
         """Check your or another user's crystal balance"""
+        economy = await self.economy(ctx.guild.id)
         target = user or ctx.author
-        balance = await self._get_balance(target.id)
-
-        async with self.get_db() as db:
-            # Get rank
-            cursor = await db.execute("""
-                SELECT COUNT(*) + 1 as rank 
-                FROM economy 
-                WHERE balance > (SELECT balance FROM economy WHERE user_id = ?)
-            """, (target.id,))
-            rank_row = await cursor.fetchone()
-            rank = rank_row['rank'] if rank_row else 1
+        balance = await economy.get_balance(target.id)
 
-            # Get total users
-            cursor = await db.execute("SELECT COUNT(*) as total FROM economy")
-            total_users = (await cursor.fetchone())['total']
+        # Rank comes from the in-memory leaderboard, no table scan
+        rank = economy.leaderboard.rank(balance)
+        total_users = len(economy.leaderboard) + (target.id not in economy.leaderboard)
 
         embed = discord.Embed(
             title=f"{target.display_name}'s {self.currency_name.capitalize()}",
@@ -217,37 +1466,56 @@ class Economy(commands.Cog):
 
         await ctx.send(embed=embed)
 
+    @commands.hybrid_command()
+    async def leaderboard(self, ctx):
+        """View the richest members of the coven"""
+        economy = await self.economy(ctx.guild.id)
+        total = len(economy.leaderboard)
+        if not total:
+            return await ctx.send("No one has earned any crystals yet.", ephemeral=True)
+
+        per_page = 10
+        page_count = (total - 1) // per_page + 1
+        author_rank = economy.leaderboard.rank(await economy.get_balance(ctx.author.id))
+
+        async def render(page: int) -> discord.Embed:
+            lines = []
+            entries = economy.leaderboard.page(page * per_page, per_page)
+            for position, (user_id, balance) in enumerate(entries, start=page * per_page + 1):
+                member = ctx.guild.get_member(user_id) if ctx.guild else None
+                name = member.display_name if member else f"<@{user_id}>"
+                lines.append(f"**#{position:,}** {name} — {self.currency_emoji} {balance:,}")
+
+            embed = discord.Embed(
+                title=f"🏆 {self.currency_name.capitalize()} Leaderboard",
+                description="\n".join(lines),
+                color=0x9B59B6
+            )
+            embed.set_footer(text=f"Page {page + 1}/{page_count} • Your rank: #{author_rank:,} of {total:,}")
+            return embed
+
+        await PageView(ctx.author, render, page_count).start(ctx)
+
     @commands.hybrid_command()
     @commands.cooldown(1, 86400, commands.BucketType.user)
     async def daily(self, ctx):
         """Claim your daily crystals"""
+        economy = await self.economy(ctx.guild.id)
         amount = 100  # Base amount
         bonus = 0
         streak = 1
 
-        async with self.get_db() as db:
-            # Get last daily claim
-            cursor = await db.execute(
-                "SELECT last_daily FROM economy WHERE user_id = ?",
-                (ctx.author.id,)
-            )
-            result = await cursor.fetchone()
+        async with economy.locks.hold(ctx.author.id):
+            # Streak state lives on the account, no ledger scan needed
+            account = await economy.ledger.load(ctx.author.id)
+            now = datetime.utcnow()
 
-            if result and result['last_daily']:
-                last_daily = datetime.fromisoformat(result['last_daily'])
-                now = datetime.utcnow()
+            if account['last_daily']:
+                last_daily = datetime.fromisoformat(account['last_daily'])
 
                 # Check if within streak window (36 hours)
                 if (now - last_daily) < timedelta(hours=36):
-                    # Calculate streak
-                    cursor = await db.execute("""
-                        SELECT COUNT(*) as streak 
-                        FROM transactions 
-                        WHERE user_id = ? 
-                        AND type = 'daily' 
-                        AND timestamp > ?
-                    """, (ctx.author.id, (now - timedelta(days=7)).isoformat()))
-                    streak = (await cursor.fetchone())['streak'] + 1
+                    streak = (account['daily_streak'] or 0) + 1
                     bonus = min(50 * streak, 200)  # Max 200 bonus
                     amount += bonus
 
@@ -270,19 +1538,13 @@ class Economy(commands.Cog):
                 desc = f"You've received {amount} {self.currency_emoji}"
                 color = 0x2ECC71
 
-            # Update last_daily
-            await db.execute(
-                """INSERT OR REPLACE INTO economy 
-                (user_id, last_daily) 
-                VALUES (?, ?)""",
-                (ctx.author.id, datetime.utcnow().isoformat())
-            )
-
-            # Add to balance
-            new_balance = await self._update_balance(
-                ctx.author.id, 
-                amount, 
-                "daily"
+            # Reward, streak and claim time land in one account upsert.
+            # We already hold the stripe, so go to the ledger directly.
+            new_balance = await economy.ledger.apply(
+                ctx.author.id,
+                amount,
+                "daily",
+                updates={"last_daily": now.isoformat(), "daily_streak": streak}
             )
 
         embed = discord.Embed(
@@ -298,6 +1560,7 @@ class Economy(commands.Cog):
     @commands.cooldown(1, 3600, commands.BucketType.user)
     async def work(self, ctx):
         """Work to earn crystals"""
+        economy = await self.economy(ctx.guild.id)
         # Generate random amount between 10-50
         base_amount = random.randint(10, 50)
 
@@ -311,7 +1574,7 @@ class Economy(commands.Cog):
             bonus = 0
 
         # Add to balance
-        new_balance = await self._update_balance(
+        new_balance = await economy.update_balance(
             ctx.author.id, 
             amount, 
             "work"
@@ -334,6 +1597,7 @@ class Economy(commands.Cog):
     @app_commands.describe(amount="Amount to transfer", user="User to transfer to")
     async def pay(self, ctx, amount: int, user: discord.Member):
         """Transfer crystals to another user"""
+        economy = await self.economy(ctx.guild.id)
         if amount <= 0:
             return await ctx.send("❌ Amount must be positive.", ephemeral=True)
 
@@ -344,38 +1608,41 @@ class Economy(commands.Cog):
             return await ctx.send("❌ Cannot transfer to yourself.", ephemeral=True)
 
         try:
-            async with self._db_lock:  # Prevent race conditions
-                # Verify sender has enough balance
-                sender_balance = await self._get_balance(ctx.author.id)
-                if sender_balance < amount:
-                    return await ctx.send("❌ Insufficient balance.", ephemeral=True)
-
-                # Perform transfer
-                await self._update_balance(
-                    ctx.author.id, 
-                    -amount, 
-                    "transfer_out", 
-                    f"to:{user.id}"
-                )
-                await self._update_balance(
-                    user.id, 
-                    amount, 
-                    "transfer_in", 
-                    f"from:{ctx.author.id}"
-                )
+            new_balance = None
+            async with economy.locks.hold(ctx.author.id, user.id):
+                # Verify sender has enough balance before taking SQLite's write lock; the
+                # stripes keep it from changing, and replies wait until the lock is released
+                sender_balance = await economy.get_balance(ctx.author.id)
+                if sender_balance >= amount:
+                    # Both sides of the transfer commit or roll back together
+                    async with economy.get_db() as db:
+                        new_balance = await economy.update_balance(
+                            ctx.author.id, 
+                            -amount, 
+                            "transfer_out", 
+                            f"to:{user.id}",
+                            db=db
+                        )
+                        await economy.update_balance(
+                            user.id, 
+                            amount, 
+                            "transfer_in", 
+                            f"from:{ctx.author.id}",
+                            db=db
+                        )
 
-                # Get new balance
-                new_balance = await self._get_balance(ctx.author.id)
+            if new_balance is None:
+                return await ctx.send("❌ Insufficient balance.", ephemeral=True)
 
-                embed = discord.Embed(
-                    title="💸 Transfer Complete",
-                    description=(
-                        f"You've sent {amount} {self.currency_emoji} to {user.mention}\n"
-                        f"Your new balance: {new_balance:,} {self.currency_emoji}"
-                    ),
-                    color=0x2ECC71
-                )
-                await ctx.send(embed=embed)
+            embed = discord.Embed(
+                title="💸 Transfer Complete",
+                description=(
+                    f"You've sent {amount} {self.currency_emoji} to {user.mention}\n"
+                    f"Your new balance: {new_balance:,} {self.currency_emoji}"
+                ),
+                color=0x2ECC71
+            )
+            await ctx.send(embed=embed)
 
         except Exception:
             await ctx.send("❌ An error occurred during the transfer.", ephemeral=True)
@@ -384,87 +1651,47 @@ class Economy(commands.Cog):
     @commands.hybrid_command()
     async def shop(self, ctx):
         """View the crystal shop"""
-        async with self.get_db() as db:
-            cursor = await db.execute("""
-                SELECT 
-                    id, name, description, price, 
-                    stock, max_per_user 
-                FROM shop_items 
-                ORDER BY price
-            """)
-            items = await cursor.fetchall()
-
-            if not items:
-                return await ctx.send("The shop is currently empty.", ephemeral=True)
-
-            embed = discord.Embed(
-                title="🛍️ Crystal Shop",
-                description="Use `/buy <item_id>` to purchase an item",
-                color=0x9B59B6
-            )
-
-            for item in items:
-                # Check how many the user already owns
-                cursor = await db.execute("""
-                    SELECT COALESCE(SUM(quantity), 0) as owned
-                    FROM user_inventory 
-                    WHERE user_id = ? AND item_id = ?
-                """, (ctx.author.id, item['id']))
-                owned = (await cursor.fetchone())['owned']
-
-                # Build item info
-                info = f"**Price:** {item['price']:,} {self.currency_emoji}\n"
-
-                # Show stock info
-                if item['stock'] > 0:
-                    info += f"**In Stock:** {item['stock']:,}\n"
-                elif item['stock'] == 0:
-                    info += "**Out of Stock**\n"
+        economy = await self.economy(ctx.guild.id)
+        if not economy.catalog.items:
+            return await ctx.send("The shop is currently empty.", ephemeral=True)
 
-                # Show ownership info
-                if item['max_per_user'] > 0:
-                    info += f"**Owned:** {owned}/{item['max_per_user']}\n"
+        owned = await economy.catalog.owned_by(ctx.author.id)
 
-                # Add description if available
-                if item['description']:
-                    info += f"\n{item['description']}"
+        async def render(page: int) -> discord.Embed:
+            embed = economy.catalog.page(page)
 
-                embed.add_field(
-                    name=f"#{item['id']} - {item['name']}",
-                    value=info,
-                    inline=False
-                )
+            # Pages are shared; only the copy gets this member's ownership
+            lines = [
+                f"**#{item_id}** {economy.catalog.items[item_id]['name']}: "
+                f"{quantity}/{economy.catalog.items[item_id]['max_per_user']}"
+                for item_id, quantity in owned.items()
+                if item_id in economy.catalog.items and economy.catalog.items[item_id]['max_per_user'] > 0
+            ]
+            if lines:
+                embed = embed.copy()
+                embed.add_field(name="Owned", value="\n".join(lines), inline=False)
+            return embed
 
-            await ctx.send(embed=embed)
+        await PageView(ctx.author, render, economy.catalog.page_count).start(ctx)
 
     @commands.hybrid_command()
     @app_commands.describe(item_id="ID of the item to buy")
     async def buy(self, ctx, item_id: int):
         """Purchase an item from the shop"""
-        try:
-            async with self._db_lock, self.get_db() as db:
-                # Get item info
-                cursor = await db.execute("""
-                        SELECT * FROM shop_items WHERE id = ?
-                    """, (item_id,))
-                item = await cursor.fetchone()
-
-                if not item:
-                    return await ctx.send("❌ Item not found.", ephemeral=True)
+        economy = await self.economy(ctx.guild.id)
+        item = economy.catalog.items.get(item_id)
+        if not item:
+            return await ctx.send("❌ Item not found.", ephemeral=True)
 
+        try:
+            async with economy.locks.hold(ctx.author.id):
                 # Check stock
                 if item['stock'] == 0:
                     return await ctx.send("❌ This item is out of stock.", ephemeral=True)
 
                 # Check if user has reached purchase limit
+                owned = (await economy.catalog.owned_by(ctx.author.id)).get(item_id, 0)
                 if item['max_per_user'] > 0:
-                    cursor = await db.execute("""
-                            SELECT COALESCE(SUM(quantity), 0) as owned
-                            FROM user_inventory 
-                            WHERE user_id = ? AND item_id = ?
-                        """, (ctx.author.id, item_id))
-                    owned = (await cursor.fetchone())['owned']
-
                     if owned >= item['max_per_user']:
                         return await ctx.send(
                             f"❌ You can only own {item['max_per_user']} of this item.",
@@ -472,77 +1699,87 @@ class Economy(commands.Cog):
                         )
 
                 # Check balance
-                balance = await self._get_balance(ctx.author.id)
+                balance = await economy.get_balance(ctx.author.id)
                 if balance < item['price']:
                     return await ctx.send(
                         f"❌ You need {item['price'] - balance} more {self.currency_emoji} to buy this!",
                         ephemeral=True
                     )
 
-                # Deduct balance
-                new_balance = await self._update_balance(
-                    ctx.author.id,
-                    -item['price'],
-                    "purchase",
-                    f"item:{item_id}"
-                )
+                # Hold a unit of stock so concurrent buyers can't oversell it
+                if not economy.catalog.reserve(item_id):
+                    return await ctx.send("❌ This item is out of stock.", ephemeral=True)
 
-                # Add to inventory
-                await db.execute("""
-                        INSERT INTO user_inventory 
-                        (user_id, item_id, quantity, purchased_at)
-                        VALUES (?, ?, 1, ?)
-                        ON CONFLICT(user_id, item_id) 
-                        DO UPDATE SET 
-                            quantity = quantity + 1,
-                            purchased_at = ?
-                    """, (
-                    ctx.author.id, 
-                    item_id, 
-                    datetime.utcnow().isoformat(),
-                    datetime.utcnow().isoformat()
-                ))
-
-                # Update stock if not unlimited
-                if item['stock'] > 0:
-                    await db.execute("""
-                            UPDATE shop_items 
-                            SET stock = stock - 1 
-                            WHERE id = ? AND stock > 0
-                        """, (item_id,))
-
-                # Commit all changes
-                await db.commit()
-
-                # Handle role assignment if applicable
-                if item['role_id']:
-                    try:
-                        role = ctx.guild.get_role(item['role_id'])
-                        if role and role not in ctx.author.roles:
-                            await ctx.author.add_roles(
-                                role, 
-                                reason=f"Purchased {item['name']}"
+                try:
+                    async with economy.get_db() as db:
+                        # Reserve the unit in one statement; no row back means sold out
+                        remaining = -1
+                        if item['stock'] >= 0:
+                            cursor = await db.execute("""
+                                    UPDATE shop_items 
+                                    SET stock = stock - 1 
+                                    WHERE id = ? AND stock > 0
+                                    RETURNING stock
+                                """, (item_id,))
+                            row = await cursor.fetchone()
+                            remaining = row['stock'] if row else None
+
+                        if remaining is not None:
+                            # Deduct balance
+                            new_balance = await economy.update_balance(
+                                ctx.author.id,
+                                -item['price'],
+                                "purchase",
+                                f"item:{item_id}",
+                                db=db
                             )
-                            role_msg = f"\nYou've been given the {role.mention} role!"
-                    except discord.Forbidden:
-                        role_msg = "\n*Note: Could not assign role (missing permissions)*"
-                    except Exception:
-                        role_msg = "\n*Note: Could not assign role*"
-                else:
-                    role_msg = ""
 
-                # Send success message
-                embed = discord.Embed(
-                    title="✅ Purchase Complete",
-                    description=(
-                        f"You've purchased **{item['name']}** for "
-                        f"{item['price']:,} {self.currency_emoji}\n"
-                        f"Your new balance: {new_balance:,} {self.currency_emoji}"
-                        f"{role_msg}"
-                    ),
-                    color=0x2ECC71
-                )
-                await ctx.send(embed=embed)
+                            # Add to inventory
+                            now = datetime.utcnow().isoformat()
+                            cursor = await db.execute("""
+                                    INSERT INTO user_inventory 
+                                    (user_id, item_id, quantity, purchased_at)
+                                    VALUES (?, ?, 1, ?)
+                                    ON CONFLICT(user_id, item_id) 
+                                    DO UPDATE SET 
+                                        quantity = quantity + 1,
+                                        purchased_at = excluded.purchased_at
+                                    RETURNING quantity
+                                """, (ctx.author.id, item_id, now))
+                            quantity = (await cursor.fetchone())['quantity']
+                except BaseException:
+                    economy.catalog.release(item_id)
+                    raise
+
+                if remaining is None:
+                    economy.catalog.sold_out(item_id)
+                    return await ctx.send("❌ This item is out of stock.", ephemeral=True)
+
+                economy.catalog.confirm(ctx.author.id, item_id, remaining, quantity)
+
+            # Purchase is committed; the role is granted in the background so
+            # a rush of buyers isn't held up behind Discord's role endpoint
+            role_msg = ""
+            if item['role_id']:
+                role = ctx.guild.get_role(item['role_id'])
+                if role and role not in ctx.author.roles:
+                    self.role_grants.put(ctx.author, role, f"Purchased {item['name']}")
+                    role_msg = f"\nThe {role.mention} role is on its way!"
+                elif not role:
+                    role_msg = "\n*Note: Could not assign role*"
+
+            # Send success message
+            embed = discord.Embed(
+                title="✅ Purchase Complete",
+                description=(
+                    f"You've purchased **{item['name']}** for "
+                    f"{item['price']:,} {self.currency_emoji}\n"
+                    f"Your new balance: {new_balance:,} {self.currency_emoji}"
+                    f"{role_msg}"
+                ),
+                color=0x2ECC71
+            )
+            await ctx.send(embed=embed)
 
         except Exception:
             await ctx.send("❌ An error occurred while processing your purchase.", ephemeral=True)
@@ -551,9 +1788,10 @@ class Economy(commands.Cog):
     @commands.hybrid_command()
     async def inventory(self, ctx, user: Optional[discord.Member] = None):
         """View your or another user's inventory"""
+        economy = await self.economy(ctx.guild.id)
         target = user or ctx.author
 
-        async with self.get_db() as db:
+        async with economy.read_db() as db:
             cursor = await db.execute("""
                 SELECT 
                     i.item_id,
@@ -569,8 +1807,9 @@ class Economy(commands.Cog):
             items = await cursor.fetchall()
 
             if not items:
+                owner = "Your" if target == ctx.author else f"{target.display_name}'s"
                 return await ctx.send(
-                    f"{'Your' if target == ctx.author else target.display_name + "'s"} inventory is empty.",
+                    f"{owner} inventory is empty.",
                     ephemeral=target != ctx.author
                 )
 
@@ -630,6 +1869,7 @@ class Economy(commands.Cog):
         max_per_user: int = 1
     ):
         """Add an item to the shop (Warlocks only)"""
+        economy = await self.economy(ctx.guild.id)
         if price < 0:
             return await ctx.send("❌ Price cannot be negative.", ephemeral=True)
 
@@ -640,17 +1880,27 @@ class Economy(commands.Cog):
             return await ctx.send("❌ Invalid max per user value.", ephemeral=True)
 
         try:
-            async with self.get_db() as db:
-                await db.execute("""
+            async with economy.get_db() as db:
+                cursor = await db.execute("""
                     INSERT INTO shop_items 
                     (name, description, price, role_id, stock, max_per_user)
                     VALUES (?, ?, ?, ?, ?, ?)
                 """, (name, description, price, role_id, stock, max_per_user))
-
-                await ctx.send(
-                    f"✅ Added **{name}** to the shop for {price} {self.currency_emoji}",
-                    ephemeral=True
-                )
+                item_id = cursor.lastrowid
+
+            economy.catalog.add({
+                "id": item_id,
+                "name": name,
+                "description": description,
+                "price": price,
+                "role_id": role_id,
+                "stock": stock,
+                "max_per_user": max_per_user
+            })
+            await ctx.send(
+                f"✅ Added **{name}** to the shop for {price} {self.currency_emoji}",
+                ephemeral=True
+            )
         except sqlite3.IntegrityError:
             await ctx.send("❌ An item with this name already exists.", ephemeral=True)
         except Exception:
@@ -662,28 +1912,24 @@ class Economy(commands.Cog):
     @app_commands.describe(item_id="ID of the item to remove")
     async def removeitem(self, ctx, item_id: int):
         """Remove an item from the shop (Warlocks only)"""
-        try:
-            async with self.get_db() as db:
-                # Get item name for the message
-                cursor = await db.execute(
-                    "SELECT name FROM shop_items WHERE id = ?",
-                    (item_id,)
-                )
-                item = await cursor.fetchone()
-
-                if not item:
-                    return await ctx.send("❌ Item not found.", ephemeral=True)
+        economy = await self.economy(ctx.guild.id)
+        item = economy.catalog.items.get(item_id)
+        if not item:
+            return await ctx.send("❌ Item not found.", ephemeral=True)
 
+        try:
+            async with economy.get_db() as db:
                 # Delete the item
                 await db.execute(
                     "DELETE FROM shop_items WHERE id = ?",
                     (item_id,)
                 )
 
-                await ctx.send(
-                    f"✅ **{item['name']}** has been removed from the shop.",
-                    ephemeral=True
-                )
+            economy.catalog.remove(item_id)
+            await ctx.send(
+                f"✅ **{item['name']}** has been removed from the shop.",
+                ephemeral=True
+            )
         except Exception:
             await ctx.send("❌ An error occurred while removing the item.", ephemeral=True)
             raise
@@ -703,6 +1949,7 @@ class Economy(commands.Cog):
         reason: str
     ):
         """Modify a user's crystal balance (Warlocks only)"""
+        economy = await self.economy(ctx.guild.id)
         if user.bot:
             return await ctx.send("❌ Cannot modify bot balances.", ephemeral=True)
 
@@ -710,7 +1957,7 @@ class Economy(commands.Cog):
             return await ctx.send("❌ Amount cannot be zero.", ephemeral=True)
 
         try:
-            new_balance = await self._update_balance(
+            new_balance = await economy.update_balance(
                 user.id,
                 amount,
                 "admin_modification",
@@ -735,42 +1982,95 @@ class Economy(commands.Cog):
             await ctx.send("❌ An error occurred while modifying the balance.", ephemeral=True)
             raise
 
+    @commands.hybrid_command()
+    @CovenTools.is_warlock()
+    @app_commands.describe(
+        amount="Amount each member receives (can be negative)",
+        reason="Reason for the payout",
+        role="Pay everyone with this role",
+        members="Members to pay, as mentions or IDs"
+    )
+    async def payout(
+        self,
+        ctx,
+        amount: int,
+        reason: str,
+        role: Optional[discord.Role] = None,
+        *,
+        members: Optional[str] = None
+    ):
+        """Pay many members at once (Warlocks only)"""
+        economy = await self.economy(ctx.guild.id)
+        if amount == 0:
+            return await ctx.send("❌ Amount cannot be zero.", ephemeral=True)
+
+        recipients = {}
+        if role:
+            recipients.update((member.id, member) for member in role.members)
+        for user_id in re.findall(r"\d{15,20}", members or ""):
+            member = ctx.guild.get_member(int(user_id))
+            if member:
+                recipients[member.id] = member
+
+        skipped = sum(1 for member in recipients.values() if member.bot)
+        user_ids = [user_id for user_id, member in recipients.items() if not member.bot]
+        if not user_ids:
+            return await ctx.send("❌ No members to pay.", ephemeral=True)
+
+        try:
+            balances = await economy.apply_deltas([
+                (user_id, amount, "admin_modification", f"{ctx.author.id}:{reason}")
+                for user_id in user_ids
+            ])
+        except Exception:
+            await ctx.send("❌ An error occurred while processing the payout.", ephemeral=True)
+            raise
+
+        action = "Paid" if amount > 0 else "Deducted"
+        embed = discord.Embed(
+            title="💰 Bulk Payout Complete",
+            description=(
+                f"{action} {abs(amount):,} {self.currency_emoji} "
+                f"{'to' if amount > 0 else 'from'} {len(balances):,} members\n"
+                f"**Total:** {abs(amount) * len(balances):,} {self.currency_emoji}\n"
+                f"**Reason:** {reason}"
+            ),
+            color=0x2ECC71 if amount > 0 else 0xE74C3C
+        )
+        if skipped:
+            embed.add_field(name="Skipped", value=f"{skipped:,} bots", inline=False)
+        embed.set_footer(text=f"Action by {ctx.author}", icon_url=ctx.author.display_avatar.url)
+
+        await ctx.send(embed=embed)
+
     @commands.hybrid_command()
     @CovenTools.is_warlock()
     async def listitems(self, ctx):
         """List all shop items (Warlocks only)"""
-        async with self.get_db() as db:
-            cursor = await db.execute("""
-                SELECT 
-                    id, name, price, stock, 
-                    (SELECT COUNT(*) FROM user_inventory WHERE item_id = shop_items.id) as total_purchased
-                FROM shop_items
-                ORDER BY id
-            """)
+        economy = await self.economy(ctx.guild.id)
+        items = [economy.catalog.items[item_id] for item_id in sorted(economy.catalog.items)]
 
-            items = await cursor.fetchall()
+        if not items:
+            return await ctx.send("The shop is empty.", ephemeral=True)
 
-            if not items:
-                return await ctx.send("The shop is empty.", ephemeral=True)
-
-            embed = discord.Embed(
-                title="🛍️ Shop Items",
-                description="All available items in the shop",
-                color=0x9B59B6
-            )
+        embed = discord.Embed(
+            title="🛍️ Shop Items",
+            description=f"All available items in the shop (catalog v{economy.catalog.version})",
+            color=0x9B59B6
+        )
 
-            for item in items:
-                info = f"**Price:** {item['price']:,} {self.currency_emoji}\n"
-                info += f"**In Stock:** {item['stock'] if item['stock'] != -1 else '∞'}\n"
-                info += f"**Total Purchased:** {item['total_purchased']:,}"
+        for item in items:
+            info = f"**Price:** {item['price']:,} {self.currency_emoji}\n"
+            info += f"**In Stock:** {item['stock'] if item['stock'] != -1 else '∞'}\n"
+            info += f"**Total Purchased:** {item['purchasers']:,}"
 
-                embed.add_field(
-                    name=f"#{item['id']} - {item['name']}",
-                    value=info,
-                    inline=False
-                )
+            embed.add_field(
+                name=f"#{item['id']} - {item['name']}",
+                value=info,
+                inline=False
+            )
 
-            await ctx.send(embed=embed, ephemeral=True)
+        await ctx.send(embed=embed, ephemeral=True)
 
     @commands.hybrid_command()
     @CovenTools.is_warlock()
@@ -782,9 +2082,13 @@ class Economy(commands.Cog):
         limit: int = 10
     ):
         """View transaction history (Warlocks only)"""
+        economy = await self.economy(ctx.guild.id)
         limit = max(1, min(20, limit))  # Clamp between 1 and 20
 
-        async with self.get_db() as db:
+        # Make sure queued ledger entries are visible to the query
+        await economy.ledger.flush()
+
+        async with economy.read_db() as db:
             if user:
                 cursor = await db.execute("""
                     SELECT 
@@ -849,5 +2153,192 @@ class Economy(commands.Cog):
 
             await ctx.send(embed=embed, ephemeral=True)
 
+    @commands.hybrid_command()
+    @CovenTools.is_warlock()
+    @app_commands.describe(
+        user="User to look up",
+        month="Archived month as YYYY-MM (defaults to all)",
+        limit="Number of transactions to show (max 20)"
+    )
+    async def archivedhistory(
+        self,
+        ctx,
+        user: discord.Member,
+        month: Optional[str] = None,
+        limit: int = 10
+    ):
+        """View compacted transaction history (Warlocks only)"""
+        economy = await self.economy(ctx.guild.id)
+        limit = max(1, min(20, limit))  # Clamp between 1 and 20
+
+        if month:
+            try:
+                month = datetime.strptime(month, "%Y-%m").strftime("%Y-%m")
+            except ValueError:
+                return await ctx.send("❌ Month must look like 2024-01.", ephemeral=True)
+
+        await ctx.defer(ephemeral=True)
+        summaries = await economy.archive.summaries(user.id, month)
+        transactions = await economy.archive.history(user.id, month, limit)
+
+        if not summaries and not transactions:
+            return await ctx.send("No archived transactions found.", ephemeral=True)
+
+        embed = discord.Embed(
+            title=f"Archived Transactions for {user.display_name}",
+            description=f"Compacted history for {month or 'all archived months'}",
+            color=0x9B59B6
+        )
+
+        if summaries:
+            lines = [
+                f"**{row['type'].title()}:** {row['count']:,} × {row['total']:+,} {self.currency_emoji} "
+                f"({row['first_day']} → {row['last_day']})"
+                for row in summaries
+            ]
+            embed.add_field(name="Totals", value="\n".join(lines), inline=False)
+
+        for txn in transactions:
+            time_str = datetime.fromisoformat(txn['timestamp']).strftime("%Y-%m-%d %H:%M:%S")
+            amount_str = f"+{txn['amount']:,}" if txn['amount'] > 0 else f"-{abs(txn['amount']):,}"
+            embed.add_field(
+                name=f"{time_str} - {txn['type'].title()}",
+                value=(
+                    f"**Amount:** {amount_str} {self.currency_emoji}\n"
+                    f"**Reference:** {txn['reference'] or 'N/A'}"
+                ),
+                inline=False
+            )
+
+        await ctx.send(embed=embed, ephemeral=True)
+
+    @commands.hybrid_command()
+    @CovenTools.is_warlock()
+    async def economysnapshot(self, ctx):
+        """Take a consistent backup of this server's economy (Warlocks only)"""
+        economy = await self.economy(ctx.guild.id)
+        await ctx.defer(ephemeral=True)
+
+        target = Path("data/backups") / f"economy-{ctx.guild.id}-{datetime.utcnow():%Y%m%d-%H%M%S}.db"
+        try:
+            start = time.perf_counter()
+            size = await economy.snapshot(target)
+            elapsed = time.perf_counter() - start
+        except Exception:
+            await ctx.send("❌ An error occurred while taking the snapshot.", ephemeral=True)
+            raise
+
+        message = f"✅ Snapshot saved to `{target}` ({size / 1024 / 1024:,.1f} MiB in {elapsed:.2f}s)"
+        # Small enough to hand over directly
+        if size <= 8 * 1024 * 1024:
+            await ctx.send(message, file=discord.File(target), ephemeral=True)
+        else:
+            await ctx.send(message, ephemeral=True)
+
+    @commands.hybrid_command()
+    @CovenTools.is_warlock()
+    @app_commands.describe(
+        file="CSV (user_id,balance header) or JSONL export",
+        mode="'set' replaces balances, 'add' adds to them"
+    )
+    async def economyimport(self, ctx, file: discord.Attachment, mode: str = "set"):
+        """Import balances from another bot (Warlocks only)"""
+        economy = await self.economy(ctx.guild.id)
+        if mode not in ("set", "add"):
+            return await ctx.send("❌ Mode must be `set` or `add`.", ephemeral=True)
+
+        await ctx.defer(ephemeral=True)
+        try:
+            balances = parse_balances(await file.read(), file.filename)
+        except (UnicodeDecodeError, ValueError) as e:
+            return await ctx.send(f"❌ Could not read `{file.filename}`: {e}", ephemeral=True)
+
+        if not balances:
+            return await ctx.send("❌ No balances found in that file.", ephemeral=True)
+
+        try:
+            start = time.perf_counter()
+            net = await economy.import_balances(
+                balances,
+                f"{ctx.author.id}:{file.filename}",
+                replace=mode == "set"
+            )
+            elapsed = time.perf_counter() - start
+        except Exception:
+            await ctx.send("❌ An error occurred while importing balances; nothing was changed.", ephemeral=True)
+            raise
+
+        embed = discord.Embed(
+            title="📥 Balances Imported",
+            description=(
+                f"**Members:** {len(balances):,} ({'set' if mode == 'set' else 'added'})\n"
+                f"**Net change:** {net:+,} {self.currency_emoji}\n"
+                f"**Took:** {elapsed:.2f}s"
+            ),
+            color=0x2ECC71
+        )
+        embed.set_footer(text=f"Action by {ctx.author}", icon_url=ctx.author.display_avatar.url)
+        await ctx.send(embed=embed, ephemeral=True)
+
+    @commands.hybrid_command()
+    @CovenTools.is_warlock()
+    async def economystats(self, ctx):
+        """Show economy lock contention and ledger state (Warlocks only)"""
+        economy = await self.economy(ctx.guild.id)
+        embed = discord.Embed(
+            title="📊 Economy Internals",
+            description=(
+                f"**Database:** `{economy.db_path}`\n"
+                f"**Guild economies open:** {len(self._guilds):,}\n"
+                f"**Role grants:** {self.role_grants.depth:,} queued, "
+                f"{self.role_grants.granted:,} granted, {self.role_grants.failed:,} failed"
+            ),
+            color=0x9B59B6
+        )
+
+        cache = economy.ledger.accounts.stats()
+        embed.add_field(
+            name="Ledger",
+            value=(
+                f"**Queued entries:** {economy.ledger.pending:,}\n"
+                f"**Write-through:** {'on' if economy.ledger.write_through else 'off'}"
+            ),
+            inline=False
+        )
+        last_run = economy.archive.last_run.strftime("%Y-%m-%d %H:%M UTC") if economy.archive.last_run else "never"
+        embed.add_field(
+            name="Archive",
+            value=(
+                f"**Horizon:** {economy.archive.horizon_days} days\n"
+                f"**Archived months:** {len(economy.archive.months()):,}\n"
+                f"**Last compaction:** {last_run} ({economy.archive.last_compacted:,} rows)"
+            ),
+            inline=False
+        )
+        embed.add_field(
+            name="Balance Cache",
+            value=(
+                f"**Size:** {cache['size']:,}/{cache['max_size']:,} ({cache['pinned']:,} pinned)\n"
+                f"**Hit rate:** {cache['hit_rate']:.1%} ({cache['hits']:,} hits, {cache['misses']:,} misses)\n"
+                f"**Evictions:** {cache['evictions']:,} • **Expired:** {cache['expirations']:,}"
+            ),
+            inline=False
+        )
+
+        stripes = economy.locks.stats()
+        if stripes:
+            lines = [
+                f"`#{row['stripe']:>2}` {row['acquisitions']:,} acq, "
+                f"{row['contended']:,} contended, "
+                f"{row['wait_time'] * 1000:,.1f} ms waited "
+                f"(max {row['max_wait'] * 1000:,.1f} ms)"
+                for row in stripes
+            ]
+            embed.add_field(name="Most Contended Lock Stripes", value="\n".join(lines), inline=False)
+        else:
+            embed.add_field(name="Most Contended Lock Stripes", value="No lock activity yet", inline=False)
+
+        await ctx.send(embed=embed, ephemeral=True)
+
 async def setup(bot):
     await bot.add_cog(Economy(bot))
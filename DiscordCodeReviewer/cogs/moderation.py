@@ -1,17 +1,18 @@
 import asyncio
 import logging
 import sqlite3
+import time
 import traceback
 from pathlib import Path
 import discord
 from discord.ext import commands
 from discord import app_commands
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import List, Optional, Tuple, Union
 from dateutil.parser import isoparse
-from cogs import CovenTools
+from cogs import CovenTools, TimerDispatcher, parse_duration
 from coven_ai import generate_wilhelmina_reply
-from config import MOD_LOG_CHANNEL_ID
+from config import MOD_LOG_CHANNEL_ID, MODERATION_UNMUTE_BATCH_SIZE, MODERATION_UNMUTE_INTERVAL_MS
 
 # Initialize logging
 log = logging.getLogger(__name__)
@@ -25,9 +26,22 @@ class Moderation(commands.Cog):
         self._db_path.parent.mkdir(exist_ok=True)
         self._ai_cooldowns = {}  # Track AI response cooldowns
 
-        # Initialize database
-        asyncio.create_task(self._init_db())
-        asyncio.create_task(self.load_warns())
+        # Timed mutes live in the mutes table; one dispatcher lifts them as they expire
+        self.unmutes = TimerDispatcher(
+            self._expire_mutes,
+            batch_size=MODERATION_UNMUTE_BATCH_SIZE,
+            batch_interval=MODERATION_UNMUTE_INTERVAL_MS / 1000
+        )
+
+    async def cog_load(self):
+        """Create the tables, load warnings and queue every timed mute still in the database"""
+        await self._init_db()
+        await self.load_warns()
+        await self.rehydrate_mutes()
+        self.unmutes.start()
+
+    async def cog_unload(self):
+        await self.unmutes.stop()
 
     async def _init_db(self):
         """Initialize the SQLite database"""
@@ -46,6 +60,16 @@ class Moderation(commands.Cog):
                     PRIMARY KEY (guild_id, user_id, timestamp)
                 )
             """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS mutes (
+                    guild_id INTEGER,
+                    user_id INTEGER,
+                    moderator_id INTEGER,
+                    reason TEXT,
+                    expires_at INTEGER,  -- Unix timestamp
+                    PRIMARY KEY (guild_id, user_id)
+                )
+            """)
 
             conn.commit()
             conn.close()
@@ -124,6 +148,46 @@ class Moderation(commands.Cog):
                     "timestamp": timestamp
                 })
 
+    def _read_mutes(self) -> List[tuple]:
+        conn = sqlite3.connect(self._db_path)
+        try:
+            return conn.execute("SELECT guild_id, user_id, moderator_id, reason, expires_at FROM mutes").fetchall()
+        finally:
+            conn.close()
+
+    def _write_mutes(self, sql: str, rows: List[tuple]):
+        conn = sqlite3.connect(self._db_path)
+        try:
+            with conn:
+                conn.executemany(sql, rows)
+        finally:
+            conn.close()
+
+    async def _save_mute(self, guild_id: int, user_id: int, moderator_id: int, reason: Optional[str], expires_at: int):
+        """Persist a timed mute and queue its expiry, replacing any earlier one for the member"""
+        await asyncio.to_thread(
+            self._write_mutes,
+            "INSERT OR REPLACE INTO mutes VALUES (?, ?, ?, ?, ?)",
+            [(guild_id, user_id, moderator_id, reason, expires_at)]
+        )
+        self.unmutes.schedule((guild_id, user_id), expires_at, (moderator_id, reason, expires_at))
+
+    async def _forget_mute(self, guild_id: int, user_id: int):
+        """Drop a member's timed mute, if any, without lifting it"""
+        self.unmutes.cancel((guild_id, user_id))
+        await asyncio.to_thread(
+            self._write_mutes, "DELETE FROM mutes WHERE guild_id = ? AND user_id = ?", [(guild_id, user_id)]
+        )
+
+    async def rehydrate_mutes(self):
+        """Queue every timed mute in the database; ones that expired while offline are lifted right away"""
+        rows = await asyncio.to_thread(self._read_mutes)
+        now = time.time()
+        for guild_id, user_id, moderator_id, reason, expires_at in rows:
+            self.unmutes.schedule((guild_id, user_id), expires_at, (moderator_id, reason, expires_at))
+        overdue = sum(expires_at <= now for *_, expires_at in rows)
+        log.info(f"Rehydrated {len(rows)} timed mutes ({overdue} overdue)")
+
     async def _get_mute_role(self, guild: discord.Guild) -> Optional[discord.Role]:
         """Get or create mute role with proper permissions"""
         if not guild.me.guild_permissions.manage_roles:
@@ -264,19 +328,10 @@ class Moderation(commands.Cog):
         # Parse duration
         mute_time = None
         if duration:
-            try:
-                time_units = {
-                    's': 'seconds',
-                    'm': 'minutes',
-                    'h': 'hours',
-                    'd': 'days'
-                }
-                unit = duration[-1].lower()
-                amount = int(duration[:-1])
-                mute_time = timedelta(**{time_units[unit]: amount})
-            except (ValueError, IndexError, KeyError):
+            mute_time = parse_duration(duration)
+            if not mute_time or mute_time <= timedelta(0):
                 return await ctx.send(
-                    "Invalid duration format! Use like `1h`, `30m`, `2d`",
+                    "Invalid duration format! Use like `1h`, `30m`, `2d` or `1h30m`",
                     ephemeral=True
                 )
 
@@ -287,6 +342,14 @@ class Moderation(commands.Cog):
         except discord.Forbidden:
             return await ctx.send("Failed to mute member!", ephemeral=True)
 
+        # Record the expiry before anything else can fail; a mute without one is permanent
+        expires_at = None
+        if mute_time:
+            expires_at = int(time.time() + mute_time.total_seconds())
+            await self._save_mute(ctx.guild.id, member.id, ctx.author.id, reason, expires_at)
+        else:
+            await self._forget_mute(ctx.guild.id, member.id)
+
         # Create embed
         embed = discord.Embed(
             title="🔇 Member Muted",
@@ -300,7 +363,7 @@ class Moderation(commands.Cog):
         if mute_time:
             embed.add_field(
                 name="Duration", 
-                value=str(mute_time).replace("days", "d").replace("day", "d"),
+                value=f"{str(mute_time).replace('days', 'd').replace('day', 'd')} (ends <t:{expires_at}:R>)",
                 inline=False
             )
 
@@ -311,61 +374,90 @@ class Moderation(commands.Cog):
         if sassy_reply:
             await ctx.send(f"🔮 *Wilhelmina observes:* {sassy_reply}")
 
-        # Schedule unmute if duration provided
-        if mute_time:
-            await self._schedule_unmute(member, mute_time, ctx.author, reason)
+    async def _expire_mutes(self, batch: List[Tuple[Tuple[int, int], Tuple[int, Optional[str], int]]]):
+        """Lift a batch of expired mutes and drop them from the database
+
+        Mutes that fail for a transient reason stay stored and are retried
+        in five minutes.
+        """
+        # Mutes that expired while offline fire at startup, before the guild cache is filled
+        await self.bot.wait_until_ready()
+        results = await asyncio.gather(
+            *[self._lift_mute(guild_id, user_id, moderator_id, reason)
+              for (guild_id, user_id), (moderator_id, reason, _) in batch],
+            return_exceptions=True
+        )
 
-    async def _schedule_unmute(self, member: discord.Member, 
-                             duration: timedelta,
-                             moderator: discord.Member,
-                             reason: Optional[str] = None):
-        """Schedule automatic unmute after duration"""
-        await asyncio.sleep(duration.total_seconds())
+        finished = []
+        for (key, payload), lifted in zip(batch, results):
+            if lifted is True:
+                finished.append((*key, payload[2]))
+            else:
+                if isinstance(lifted, Exception):
+                    log.error(f"Error unmuting {key[1]} in guild {key[0]}: {lifted}")
+                # A newer mute queued while we were lifting this one takes precedence
+                if key not in self.unmutes:
+                    self.unmutes.schedule(key, time.time() + 300, payload)
+        # Only the expiry that fired, so a mute re-applied meanwhile survives
+        await asyncio.to_thread(
+            self._write_mutes,
+            "DELETE FROM mutes WHERE guild_id = ? AND user_id = ? AND expires_at = ?",
+            finished
+        )
 
+    async def _lift_mute(self, guild_id: int, user_id: int,
+                         moderator_id: int,
+                         reason: Optional[str] = None) -> bool:
+        """Remove an expired mute; False means it should be retried"""
         # Check if member still exists and is muted
-        guild = self.bot.get_guild(member.guild.id)
+        guild = self.bot.get_guild(guild_id)
         if not guild:
-            return
+            return True
 
-        member = guild.get_member(member.id)
+        member = guild.get_member(user_id)
         if not member:
-            return
+            return True
 
         mute_role = discord.utils.get(guild.roles, name=self._mute_role_name)
         if not mute_role or mute_role not in member.roles:
-            return
+            return True
 
         # Unmute
         try:
             await member.remove_roles(mute_role, reason="Automatic unmute after timeout")
-
-            # Log in mod channel
-            if MOD_LOG_CHANNEL_ID:
-                channel = self.bot.get_channel(MOD_LOG_CHANNEL_ID)
-                if channel:
-                    embed = discord.Embed(
-                        title="🔊 Member Automatically Unmuted",
-                        color=discord.Color.green(),
-                        timestamp=datetime.utcnow()
-                    )
-                    embed.add_field(name="User", value=member.mention, inline=True)
-                    embed.add_field(name="Original Mute By", value=moderator.mention, inline=True)
-                    if reason:
-                        embed.add_field(name="Original Reason", value=reason, inline=False)
-
-                    await channel.send(embed=embed)
-
-            # DM the user
-            try:
-                await member.send(f"Your mute in **{guild.name}** has expired.")
-            except discord.Forbidden:
-                pass
-
-        except discord.Forbidden:
+        except (discord.Forbidden, discord.NotFound):
             log.error(f"Failed to unmute {member} (ID: {member.id}) in {guild.name}")
+            return True
         except Exception as e:
             log.error(f"Error unmuting {member}: {e}")
             await self._log_error(f"Error during scheduled unmute: {traceback.format_exc()}")
+            return False
+
+        # Log in mod channel
+        if MOD_LOG_CHANNEL_ID:
+            channel = self.bot.get_channel(MOD_LOG_CHANNEL_ID)
+            if channel:
+                embed = discord.Embed(
+                    title="🔊 Member Automatically Unmuted",
+                    color=discord.Color.green(),
+                    timestamp=datetime.utcnow()
+                )
+                embed.add_field(name="User", value=member.mention, inline=True)
+                embed.add_field(name="Original Mute By", value=f"<@{moderator_id}>", inline=True)
+                if reason:
+                    embed.add_field(name="Original Reason", value=reason, inline=False)
+
+                try:
+                    await channel.send(embed=embed)
+                except discord.HTTPException as e:
+                    log.error(f"Failed to log unmute of {member}: {e}")
+
+        # DM the user
+        try:
+            await member.send(f"Your mute in **{guild.name}** has expired.")
+        except discord.HTTPException:
+            pass
+        return True
 
     @commands.hybrid_command()
     @app_commands.describe(
@@ -385,6 +477,7 @@ class Moderation(commands.Cog):
 
         try:
             await member.remove_roles(mute_role, reason=reason or "Manual unmute")
+            await self._forget_mute(ctx.guild.id, member.id)
 
             embed = discord.Embed(
                 title="🔊 Member Unmuted",
@@ -1,190 +1,921 @@
 from discord import app_commands
 import asyncio
+import aiosqlite
+import bisect
 import discord
+import functools
+import inspect
 import logging
-import sqlite3
-from datetime import datetime, timedelta
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone, tzinfo
+from dateutil.rrule import rrulestr
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from discord.ext import commands, tasks
-from typing import Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
-from .. import CovenTools
+from cogs import CovenTools, SQLitePool, PageView, Migration, TimerDispatcher, parse_when
+from config import (
+    SCHEDULER_FIRE_BATCH_SIZE, SCHEDULER_FIRE_INTERVAL_MS,
+    SCHEDULER_RECONCILE_MINUTES, SCHEDULER_SEND_CONCURRENCY,
+    SCHEDULER_LISTING_CACHE_SIZE, SCHEDULER_LISTING_CACHE_TTL
+)
 
 # Initialize logging
 log = logging.getLogger(__name__)
 
+async def _create_base_schema(db: aiosqlite.Connection):
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS scheduled_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            creator_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            description TEXT,
+            event_time TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            reminder_sent BOOLEAN DEFAULT 0
+        )
+    """)
+
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS reminders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            content TEXT NOT NULL,
+            remind_time TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    """)
+
+async def _use_epoch_timestamps(db: aiosqlite.Connection):
+    """Rebuild both tables with integer Unix timestamps and due-time indexes
+
+    ISO text compared as strings and had no index, so every due-time check
+    and /reminders call scanned the whole table.
+    """
+    await db.execute("""
+        CREATE TABLE scheduled_events_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            creator_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            description TEXT,
+            event_time INTEGER NOT NULL,
+            created_at INTEGER NOT NULL,
+            reminder_sent INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    await db.execute("""
+        INSERT INTO scheduled_events_new
+        SELECT id, guild_id, channel_id, creator_id, title, description,
+               CAST(strftime('%s', event_time) AS INTEGER),
+               CAST(strftime('%s', created_at) AS INTEGER),
+               COALESCE(reminder_sent, 0)
+        FROM scheduled_events
+    """)
+    await db.execute("DROP TABLE scheduled_events")
+    await db.execute("ALTER TABLE scheduled_events_new RENAME TO scheduled_events")
+    await db.execute("CREATE INDEX idx_events_due ON scheduled_events(reminder_sent, event_time)")
+
+    await db.execute("""
+        CREATE TABLE reminders_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            content TEXT NOT NULL,
+            remind_time INTEGER NOT NULL,
+            created_at INTEGER NOT NULL
+        )
+    """)
+    await db.execute("""
+        INSERT INTO reminders_new
+        SELECT id, user_id, channel_id, content,
+               CAST(strftime('%s', remind_time) AS INTEGER),
+               CAST(strftime('%s', created_at) AS INTEGER)
+        FROM reminders
+    """)
+    await db.execute("DROP TABLE reminders")
+    await db.execute("ALTER TABLE reminders_new RENAME TO reminders")
+    await db.execute("CREATE INDEX idx_reminders_user_due ON reminders(user_id, remind_time)")
+
+async def _add_recurrence(db: aiosqlite.Connection):
+    """A recurring event is one row whose event_time is its next occurrence"""
+    await SQLitePool.add_column(db, "scheduled_events", "recurrence", "TEXT")
+    await SQLitePool.add_column(db, "scheduled_events", "series_start", "INTEGER")
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_events_recurring
+        ON scheduled_events(event_time) WHERE recurrence IS NOT NULL
+    """)
+
+async def _add_listing_index(db: aiosqlite.Connection):
+    """/events pages through a guild's events in (event_time, id) order"""
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_events_guild_time ON scheduled_events(guild_id, event_time)")
+
+async def _add_user_timezones(db: aiosqlite.Connection):
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS user_timezones (
+            user_id INTEGER PRIMARY KEY,
+            timezone TEXT NOT NULL
+        )
+    """)
+
+async def _rebase_series(db: aiosqlite.Connection):
+    """series_start becomes the current occurrence, with COUNT reduced to what's left from it"""
+    cursor = await db.execute("""
+        SELECT id, event_time, recurrence, series_start FROM scheduled_events
+        WHERE recurrence IS NOT NULL AND series_start < event_time
+    """)
+    for event_id, event_time, recurrence, series_start in await cursor.fetchall():
+        count = re.search(r"COUNT=(\d+)", recurrence)
+        if count:
+            passed = 0
+            for moment in rrulestr(recurrence, dtstart=_from_timestamp(series_start)):
+                if moment >= _from_timestamp(event_time):
+                    break
+                passed += 1
+            recurrence = recurrence.replace(count.group(0), f"COUNT={max(int(count.group(1)) - passed, 1)}")
+        await db.execute(
+            "UPDATE scheduled_events SET recurrence = ?, series_start = event_time WHERE id = ?",
+            (recurrence, event_id)
+        )
+
+# Append-only: never edit a released migration, add a new one instead
+MIGRATIONS: List[Migration] = [
+    (1, "base schema", _create_base_schema),
+    (2, "epoch timestamps and due-time indexes", _use_epoch_timestamps),
+    (3, "recurring events", _add_recurrence),
+    (4, "event listing index", _add_listing_index),
+    (5, "user time zones", _add_user_timezones),
+    (6, "rebase recurring events onto their current occurrence", _rebase_series),
+]
+
+EVENTS_PER_PAGE = 5
+REMINDERS_PER_PAGE = 10
+
+RECURRENCE_PRESETS = {"daily": "FREQ=DAILY", "weekly": "FREQ=WEEKLY", "monthly": "FREQ=MONTHLY"}
+
+def _parse_recurrence(text: str, start: datetime) -> str:
+    """Normalize daily/weekly/monthly or an iCalendar RRULE to RRULE text, raising ValueError if invalid"""
+    rule = RECURRENCE_PRESETS.get(text.strip().lower())
+    if rule is None:
+        rule = text.strip().upper()
+        if rule.startswith("RRULE:"):
+            rule = rule[len("RRULE:"):]
+        # Times are naive UTC throughout, so drop the UTC marker from UNTIL
+        rule = re.sub(r"(UNTIL=\d{8}(?:T\d{6})?)Z", r"\1", rule)
+
+    if "\n" in rule or "DTSTART" in rule:
+        raise ValueError("only a single RRULE line is supported")
+    freq = re.search(r"FREQ=(\w+)", rule)
+    if not freq or freq.group(1) not in ("DAILY", "WEEKLY", "MONTHLY", "YEARLY"):
+        raise ValueError("FREQ must be DAILY, WEEKLY, MONTHLY or YEARLY")
+    # These would expand a day into many occurrences; a series repeats at most daily
+    if re.search(r"\bBY(?:HOUR|MINUTE|SECOND)=", rule):
+        raise ValueError("BYHOUR, BYMINUTE and BYSECOND aren't supported")
+
+    rrulestr(rule, dtstart=start)  # Raises ValueError for anything else malformed
+    return rule
+
+def _describe_recurrence(rule: str) -> str:
+    for name, preset in RECURRENCE_PRESETS.items():
+        if rule == preset:
+            return name.capitalize()
+    return rule
+
+def _next_occurrence(rule: str, anchor: datetime, after: datetime) -> Tuple[Optional[datetime], str]:
+    """First occurrence of a series strictly after ``after`` (None once it has ended) and the rule rebased onto it
+
+    The rule is expanded from ``anchor``, the series' current occurrence,
+    rather than its first one, so advancing costs the same however long the
+    series has run. COUNT is reduced by the occurrences passed over, leaving
+    what remains from the returned occurrence on.
+    """
+    passed = 0
+    for moment in rrulestr(rule, dtstart=anchor):
+        if moment > after:
+            break
+        passed += 1
+    else:
+        return None, rule
+
+    count = re.search(r"COUNT=(\d+)", rule)
+    if count and passed:
+        rule = rule.replace(count.group(0), f"COUNT={int(count.group(1)) - passed}")
+    return moment, rule
+
+def _epoch(moment: datetime) -> float:
+    """Unix timestamp for a naive UTC datetime"""
+    return moment.replace(tzinfo=timezone.utc).timestamp()
+
+def _timestamp(moment: datetime) -> int:
+    """Whole-second Unix timestamp, as stored in the database"""
+    return int(_epoch(moment))
+
+def _from_timestamp(seconds: int) -> datetime:
+    """Naive UTC datetime for a stored Unix timestamp"""
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None)
+
+# (time, id) of the last row on the previous page
+Cursor = Tuple[int, int]
+
+class Listing:
+    """One keyset-paginated listing: its row count and the pages fetched so far
+
+    Pages are fetched in order with ``WHERE (time, id) > cursor LIMIT n``, so
+    every page costs one index range scan however deep it is. ``fetch`` must
+    return rows with an ``id`` column and their time as the last column.
+    """
+
+    def __init__(self, count: int, start: Cursor, per_page: int,
+                 fetch: Callable[[Cursor, int], Awaitable[List[aiosqlite.Row]]]):
+        self.count = count
+        self.per_page = per_page
+        self.created = time.monotonic()
+        self._fetch = fetch
+        self._cursors = [start]  # _cursors[i] is where page i starts
+        self._pages: List[List[aiosqlite.Row]] = []
+        self._lock = asyncio.Lock()
+
+    @property
+    def page_count(self) -> int:
+        return max(1, -(-self.count // self.per_page))
+
+    async def page(self, index: int) -> List[aiosqlite.Row]:
+        async with self._lock:
+            while len(self._pages) <= index:
+                rows = await self._fetch(self._cursors[-1], self.per_page)
+                if not rows:
+                    return []
+                self._pages.append(rows)
+                self._cursors.append((rows[-1][-1], rows[-1]['id']))
+            return self._pages[index]
+
+class ListingCache:
+    """Small LRU of listings keyed ("events", guild_id) or ("reminders", user_id)
+
+    Entries are dropped as soon as their events or reminders change, and
+    after ``ttl`` seconds so relative times and started events don't linger.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._listings: "OrderedDict[Tuple[str, int], Listing]" = OrderedDict()
+
+    def get(self, key: Tuple[str, int]) -> Optional[Listing]:
+        listing = self._listings.get(key)
+        if listing is None:
+            return None
+        if time.monotonic() - listing.created > self.ttl:
+            del self._listings[key]
+            return None
+        self._listings.move_to_end(key)
+        return listing
+
+    def put(self, key: Tuple[str, int], listing: Listing):
+        self._listings[key] = listing
+        self._listings.move_to_end(key)
+        while len(self._listings) > self.max_size:
+            self._listings.popitem(last=False)
+
+    def invalidate(self, key: Tuple[str, int]):
+        self._listings.pop(key, None)
+
+    def invalidate_all(self):
+        self._listings.clear()
+
+class SchedulerMetrics:
+    """Counters behind /schedulerstats and the /metrics endpoint
+
+    Lateness is how long after its intended time a timer actually fired;
+    anything over ``MISSED_AFTER`` seconds (e.g. due while the bot was
+    offline) also counts as a missed fire.
+    """
+
+    LATENESS_BUCKETS = (0.05, 0.25, 1, 5, 15, 60, 300, 3600)  # Seconds
+    MISSED_AFTER = 60
+
+    def __init__(self):
+        self.lateness_counts = [0] * (len(self.LATENESS_BUCKETS) + 1)  # Last bucket is +Inf
+        self.lateness_sum = 0.0
+        self.lateness_max = 0.0
+        self.fired: Dict[str, int] = {}  # {kind: timers fired}
+        self.missed: Dict[str, int] = {}  # {kind: fired more than MISSED_AFTER late}
+        self.delivered: Dict[str, int] = {}  # {"dm" / "channel" / "event": messages' worth of items}
+        self.failures: Dict[str, int] = {}  # {reason: count}
+        self.db_ops: Dict[str, List[float]] = {}  # {operation: [calls, seconds, max seconds]}
+
+    @staticmethod
+    def _count(counter: Dict[str, int], name: str, amount: int = 1):
+        counter[name] = counter.get(name, 0) + amount
+
+    def observe_fire(self, key: Tuple[str, int], lateness: float):
+        kind = key[0]
+        lateness = max(0.0, lateness)
+        self.lateness_counts[bisect.bisect_left(self.LATENESS_BUCKETS, lateness)] += 1
+        self.lateness_sum += lateness
+        self.lateness_max = max(self.lateness_max, lateness)
+        self._count(self.fired, kind)
+        if lateness > self.MISSED_AFTER:
+            self._count(self.missed, kind)
+
+    def delivery(self, route: str, amount: int = 1):
+        self._count(self.delivered, route, amount)
+
+    def failure(self, reason: str, amount: int = 1):
+        self._count(self.failures, reason, amount)
+
+    def observe_db(self, operation: str, seconds: float):
+        stats = self.db_ops.setdefault(operation, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] = max(stats[2], seconds)
+
+    def lateness_percentile(self, pct: float) -> Optional[float]:
+        """Upper bound of the bucket holding the pct-th percentile (inf past the last bucket)"""
+        total = sum(self.lateness_counts)
+        if not total:
+            return None
+        running = 0
+        for bound, count in zip(self.LATENESS_BUCKETS + (float("inf"),), self.lateness_counts):
+            running += count
+            if running >= total * pct / 100:
+                return bound
+        return float("inf")
+
+    def prometheus(self, pending: Dict[str, int], backlog: float) -> str:
+        """Everything in the Prometheus text exposition format"""
+        lines = [
+            "# HELP scheduler_pending_timers Reminders and event announcements waiting to fire",
+            "# TYPE scheduler_pending_timers gauge",
+        ]
+        lines += [f'scheduler_pending_timers{{kind="{kind}"}} {count}' for kind, count in sorted(pending.items())]
+        lines += [
+            "# HELP scheduler_backlog_seconds How overdue the earliest pending timer is",
+            "# TYPE scheduler_backlog_seconds gauge",
+            f"scheduler_backlog_seconds {backlog:.3f}",
+            "# HELP scheduler_fire_lateness_seconds Actual minus intended fire time",
+            "# TYPE scheduler_fire_lateness_seconds histogram",
+        ]
+        running = 0
+        for bound, count in zip(self.LATENESS_BUCKETS + ("+Inf",), self.lateness_counts):
+            running += count
+            lines.append(f'scheduler_fire_lateness_seconds_bucket{{le="{bound}"}} {running}')
+        lines += [
+            f"scheduler_fire_lateness_seconds_sum {self.lateness_sum:.3f}",
+            f"scheduler_fire_lateness_seconds_count {running}",
+        ]
+        for name, help_text, counter, label in (
+            ("scheduler_fired_total", "Timers fired", self.fired, "kind"),
+            ("scheduler_missed_fires_total", f"Timers fired over {self.MISSED_AFTER}s late", self.missed, "kind"),
+            ("scheduler_deliveries_total", "Reminders and announcements delivered", self.delivered, "route"),
+            ("scheduler_delivery_failures_total", "Failed delivery attempts", self.failures, "reason"),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            lines += [f'{name}{{{label}="{key}"}} {value}' for key, value in sorted(counter.items())]
+        lines += [
+            "# HELP scheduler_db_seconds_total Time spent in SchedulerStore operations",
+            "# TYPE scheduler_db_seconds_total counter",
+        ]
+        lines += [f'scheduler_db_seconds_total{{op="{op}"}} {stats[1]:.6f}' for op, stats in sorted(self.db_ops.items())]
+        lines += [
+            "# HELP scheduler_db_calls_total SchedulerStore operations run",
+            "# TYPE scheduler_db_calls_total counter",
+        ]
+        lines += [f'scheduler_db_calls_total{{op="{op}"}} {stats[0]}' for op, stats in sorted(self.db_ops.items())]
+        return "\n".join(lines) + "\n"
+
+def _timed(method):
+    """Record each call's duration in the store's metrics under the method's name"""
+    if inspect.isasyncgenfunction(method):
+        @functools.wraps(method)
+        async def stream(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                async for row in method(self, *args, **kwargs):
+                    yield row
+            finally:
+                self.metrics.observe_db(method.__name__, time.perf_counter() - start)
+        return stream
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            self.metrics.observe_db(method.__name__, time.perf_counter() - start)
+    return wrapper
+
+class SchedulerStore:
+    """Every query the Scheduler makes, on a shared connection pool
+
+    Keeps SQL out of the commands and all disk I/O off the event loop.
+    """
+
+    def __init__(self, pool: SQLitePool, metrics: Optional[SchedulerMetrics] = None):
+        self._pool = pool
+        self.metrics = metrics or SchedulerMetrics()
+
+    async def open(self):
+        await self._pool.open()
+        await self._pool.migrate(MIGRATIONS)
+
+    async def close(self):
+        await self._pool.close()
+
+    # Events
+
+    @_timed
+    async def add_event(
+        self,
+        guild_id: int,
+        channel_id: int,
+        creator_id: int,
+        title: str,
+        description: Optional[str],
+        event_time: datetime,
+        recurrence: Optional[str] = None
+    ) -> int:
+        async with self._pool.transaction() as db:
+            cursor = await db.execute(
+                """
+                INSERT INTO scheduled_events 
+                (guild_id, channel_id, creator_id, title, description, event_time, created_at,
+                 recurrence, series_start)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    guild_id,
+                    channel_id,
+                    creator_id,
+                    title,
+                    description,
+                    _timestamp(event_time),
+                    _timestamp(datetime.utcnow()),
+                    recurrence,
+                    _timestamp(event_time) if recurrence else None
+                )
+            )
+            return cursor.lastrowid
+
+    @_timed
+    async def pending_events(self, after: datetime) -> AsyncIterator[aiosqlite.Row]:
+        """Stream every future event whose reminder hasn't gone out"""
+        async with self._pool.acquire() as db:
+            async with db.execute("""
+                SELECT id, guild_id, channel_id, title, event_time
+                FROM scheduled_events
+                WHERE event_time > ? AND reminder_sent = 0
+            """, (_timestamp(after),)) as cursor:
+                cursor.arraysize = 500
+                async for row in cursor:
+                    yield row
+
+    @_timed
+    async def claim_event_reminder(self, event_id: int) -> Optional[aiosqlite.Row]:
+        """Mark an event's reminder as sent, returning its recurrence and series_start
+
+        None if it was already sent or the event is gone.
+        """
+        async with self._pool.transaction() as db:
+            cursor = await db.execute(
+                """
+                UPDATE scheduled_events SET reminder_sent = 1
+                WHERE id = ? AND reminder_sent = 0
+                RETURNING recurrence, series_start
+                """,
+                (event_id,)
+            )
+            return await cursor.fetchone()
+
+    @_timed
+    async def advance_series(self, event_id: int, anchor: datetime, next_time: Optional[datetime], recurrence: str):
+        """Move a recurring event from ``anchor`` on to its next occurrence, or end the series
+
+        A no-op if the series has already moved on from ``anchor``.
+        """
+        async with self._pool.transaction() as db:
+            if next_time:
+                await db.execute(
+                    """
+                    UPDATE scheduled_events
+                    SET event_time = ?, series_start = ?, recurrence = ?, reminder_sent = 0
+                    WHERE id = ? AND series_start = ?
+                    """,
+                    (_timestamp(next_time), _timestamp(next_time), recurrence, event_id, _timestamp(anchor))
+                )
+            else:
+                # The last occurrence stays until it is pruned like a one-off event
+                await db.execute(
+                    "UPDATE scheduled_events SET recurrence = NULL WHERE id = ? AND series_start = ?",
+                    (event_id, _timestamp(anchor))
+                )
+
+    @_timed
+    async def stale_series(self, now: datetime) -> List[aiosqlite.Row]:
+        """Recurring events whose current occurrence has already started"""
+        async with self._pool.acquire() as db:
+            cursor = await db.execute(
+                """
+                SELECT id, event_time, recurrence, series_start
+                FROM scheduled_events
+                WHERE recurrence IS NOT NULL AND event_time <= ?
+                """,
+                (_timestamp(now),)
+            )
+            return await cursor.fetchall()
+
+    @_timed
+    async def announced_series(self, now: datetime) -> List[aiosqlite.Row]:
+        """Recurring events whose reminder has gone out but whose occurrence hasn't started yet"""
+        async with self._pool.acquire() as db:
+            cursor = await db.execute(
+                """
+                SELECT id, guild_id, channel_id, title, event_time, recurrence, series_start
+                FROM scheduled_events
+                WHERE recurrence IS NOT NULL AND event_time > ? AND reminder_sent = 1
+                """,
+                (_timestamp(now),)
+            )
+            return await cursor.fetchall()
+
+    @_timed
+    async def delete_events_before(self, cutoff: datetime) -> int:
+        """Prune one-off events (and finished series) that ended before ``cutoff``"""
+        async with self._pool.transaction() as db:
+            cursor = await db.execute(
+                "DELETE FROM scheduled_events WHERE event_time < ? AND recurrence IS NULL",
+                (_timestamp(cutoff),)
+            )
+            return cursor.rowcount
+
+    @_timed
+    async def count_events(self, guild_id: int, after: Cursor) -> int:
+        async with self._pool.acquire() as db:
+            cursor = await db.execute(
+                "SELECT COUNT(*) FROM scheduled_events WHERE guild_id = ? AND (event_time, id) > (?, ?)",
+                (guild_id, *after)
+            )
+            return (await cursor.fetchone())[0]
+
+    @_timed
+    async def events_page(self, guild_id: int, after: Cursor, limit: int) -> List[aiosqlite.Row]:
+        """A guild's next ``limit`` events after the (event_time, id) cursor"""
+        async with self._pool.acquire() as db:
+            cursor = await db.execute(
+                """
+                SELECT id, channel_id, creator_id, title, description, recurrence, event_time
+                FROM scheduled_events
+                WHERE guild_id = ? AND (event_time, id) > (?, ?)
+                ORDER BY event_time, id
+                LIMIT ?
+                """,
+                (guild_id, *after, limit)
+            )
+            return await cursor.fetchall()
+
+    @_timed
+    async def delete_event(self, event_id: int, guild_id: int) -> Optional[aiosqlite.Row]:
+        """Delete a guild's event, returning its title and creator if it existed"""
+        async with self._pool.transaction() as db:
+            cursor = await db.execute(
+                "DELETE FROM scheduled_events WHERE id = ? AND guild_id = ? RETURNING title, creator_id",
+                (event_id, guild_id)
+            )
+            return await cursor.fetchone()
+
+    # Time zones
+
+    @_timed
+    async def get_timezone(self, user_id: int) -> Optional[str]:
+        async with self._pool.acquire() as db:
+            cursor = await db.execute("SELECT timezone FROM user_timezones WHERE user_id = ?", (user_id,))
+            row = await cursor.fetchone()
+            return row['timezone'] if row else None
+
+    @_timed
+    async def set_timezone(self, user_id: int, name: str):
+        async with self._pool.transaction() as db:
+            await db.execute(
+                """
+                INSERT INTO user_timezones (user_id, timezone) VALUES (?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET timezone = excluded.timezone
+                """,
+                (user_id, name)
+            )
+
+    # Reminders
+
+    @_timed
+    async def add_reminder(
+        self,
+        user_id: int,
+        channel_id: int,
+        content: str,
+        remind_time: datetime,
+        created_at: datetime
+    ) -> int:
+        async with self._pool.transaction() as db:
+            cursor = await db.execute(
+                """
+                INSERT INTO reminders
+                (user_id, channel_id, content, remind_time, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (user_id, channel_id, content, _timestamp(remind_time), _timestamp(created_at))
+            )
+            return cursor.lastrowid
+
+    @_timed
+    async def delete_reminders(self, reminder_ids: List[int]) -> int:
+        """Delete delivered reminders in one statement"""
+        if not reminder_ids:
+            return 0
+        async with self._pool.transaction() as db:
+            cursor = await db.execute(
+                f"DELETE FROM reminders WHERE id IN ({', '.join('?' * len(reminder_ids))})",
+                reminder_ids
+            )
+            return cursor.rowcount
+
+    @_timed
+    async def pending_reminders(self) -> AsyncIterator[aiosqlite.Row]:
+        """Stream every undelivered reminder, overdue ones included"""
+        async with self._pool.acquire() as db:
+            async with db.execute(
+                "SELECT id, user_id, channel_id, content, remind_time FROM reminders"
+            ) as cursor:
+                cursor.arraysize = 500
+                async for row in cursor:
+                    yield row
+
+    @_timed
+    async def count_reminders(self, user_id: int) -> int:
+        async with self._pool.acquire() as db:
+            cursor = await db.execute("SELECT COUNT(*) FROM reminders WHERE user_id = ?", (user_id,))
+            return (await cursor.fetchone())[0]
+
+    @_timed
+    async def reminders_page(self, user_id: int, after: Cursor, limit: int) -> List[aiosqlite.Row]:
+        """A user's next ``limit`` reminders after the (remind_time, id) cursor"""
+        async with self._pool.acquire() as db:
+            cursor = await db.execute(
+                """
+                SELECT id, content, remind_time
+                FROM reminders
+                WHERE user_id = ? AND (remind_time, id) > (?, ?)
+                ORDER BY remind_time, id
+                LIMIT ?
+                """,
+                (user_id, *after, limit)
+            )
+            return await cursor.fetchall()
+
+    @_timed
+    async def delete_reminder(self, reminder_id: int, user_id: Optional[int] = None) -> Optional[str]:
+        """Delete a reminder (only the owner's, if given), returning its content"""
+        async with self._pool.transaction() as db:
+            if user_id is None:
+                cursor = await db.execute(
+                    "DELETE FROM reminders WHERE id = ? RETURNING content",
+                    (reminder_id,)
+                )
+            else:
+                cursor = await db.execute(
+                    "DELETE FROM reminders WHERE id = ? AND user_id = ? RETURNING content",
+                    (reminder_id, user_id)
+                )
+            row = await cursor.fetchone()
+            return row['content'] if row else None
+
 class Scheduler(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self._db_path = Path("data/scheduler.db")
         self._db_path.parent.mkdir(exist_ok=True)
-        self._tasks = {}  # {event_id: asyncio.Task}
-        self._reminders = {}  # {user_id: {reminder_id: asyncio.Task}}
-
-        # Initialize database
-        asyncio.create_task(self._init_db())
-        # Start the scheduled events checker
-        self.check_events.start()
-
-    async def _init_db(self):
-        """Initialize the SQLite database"""
-        async with asyncio.Lock():
-            conn = sqlite3.connect(self._db_path)
-            cursor = conn.cursor()
-
-            # Create tables if they don't exist
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS scheduled_events (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER NOT NULL,
-                    channel_id INTEGER NOT NULL,
-                    creator_id INTEGER NOT NULL,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    event_time TEXT NOT NULL,
-                    created_at TEXT NOT NULL,
-                    reminder_sent BOOLEAN DEFAULT 0
-                )
-            """)
-
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS reminders (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    channel_id INTEGER NOT NULL,
-                    content TEXT NOT NULL,
-                    remind_time TEXT NOT NULL,
-                    created_at TEXT NOT NULL
-                )
-            """)
-
-            conn.commit()
-            conn.close()
-
-    def cog_unload(self):
+        self.metrics = SchedulerMetrics()
+        self.store = SchedulerStore(SQLitePool(self._db_path), self.metrics)
+        # Every pending timer lives in one heap: ("event", id) or ("reminder", id), plus
+        # ("series", id) to move an announced series on once its occurrence starts
+        self.timers = TimerDispatcher(
+            self._fire_timers,
+            batch_size=SCHEDULER_FIRE_BATCH_SIZE,
+            batch_interval=SCHEDULER_FIRE_INTERVAL_MS / 1000,
+            on_fire=self.metrics.observe_fire
+        )
+        self._send_slots = asyncio.Semaphore(SCHEDULER_SEND_CONCURRENCY)
+        self.listings = ListingCache(SCHEDULER_LISTING_CACHE_SIZE, SCHEDULER_LISTING_CACHE_TTL)
+        self._timezones: Dict[int, tzinfo] = {}  # {user_id: zone}, filled as users show up
+
+    async def cog_load(self):
+        """Open the database, reload pending timers, then start the dispatcher and the reconciliation pass"""
+        await self.store.open()
+        await self.rehydrate()
+        self.timers.start()
+        self.reconcile_events.start()
+
+    async def rehydrate(self):
+        """Put every reminder and event announcement still in SQLite back into the dispatcher
+
+        Overdue ones come due immediately and drain in paced batches.
+        """
+        now = datetime.utcnow()
+        reminders = events = overdue = 0
+        async for reminder_id, user_id, channel_id, content, remind_time in self.store.pending_reminders():
+            remind_time = _from_timestamp(remind_time)
+            self.timers.schedule(("reminder", reminder_id), _epoch(remind_time), (user_id, channel_id, content))
+            reminders += 1
+            overdue += remind_time <= now
+
+        await self._catch_up_series(now)
+        async for event_id, guild_id, channel_id, title, event_time in self.store.pending_events(now):
+            event_time = _from_timestamp(event_time)
+            self._schedule_event_reminder(event_id, guild_id, channel_id, title, event_time)
+            events += 1
+            overdue += event_time - timedelta(minutes=30) <= now
+        await self._queue_announced_series(now)
+
+        log.info(f"Rehydrated {reminders} reminders and {events} events ({overdue} overdue)")
+
+    async def cog_unload(self):
         """Clean up when cog is unloaded"""
-        self.check_events.cancel()
-
-        # Cancel all running tasks
-        for task in self._tasks.values():
-            task.cancel()
+        self.reconcile_events.cancel()
+        await self.timers.stop()
+        await self.store.close()
 
-        for user_reminders in self._reminders.values():
-            for task in user_reminders.values():
-                task.cancel()
+    async def _fire_timers(self, batch: List[Tuple[Tuple[str, int], Any]]):
+        """Deliver a batch of due timers: events one by one, reminders coalesced"""
+        # Overdue timers fire at startup, before the user, guild and channel caches are filled
+        await self.bot.wait_until_ready()
+        deliveries = []
+        reminders = []
+        for (kind, item_id), payload in batch:
+            if kind == "event":
+                deliveries.append(self._send_event_reminder(item_id, *payload))
+            elif kind == "series":
+                deliveries.append(self._advance_series(item_id, *payload))
+            else:
+                reminders.append((item_id, *payload))
+        if reminders:
+            deliveries.append(self._deliver_reminders(reminders))
 
-    @tasks.loop(minutes=5)
-    async def check_events(self):
-        """Check for events that need reminders"""
-        now = datetime.utcnow()
-        reminder_threshold = now + timedelta(minutes=30)
+        for result in await asyncio.gather(*deliveries, return_exceptions=True):
+            if isinstance(result, Exception):
+                self.metrics.failure("error")
+                log.error(f"Error delivering reminder: {result}")
 
-        conn = sqlite3.connect(self._db_path)
-        cursor = conn.cursor()
+    @tasks.loop(minutes=SCHEDULER_RECONCILE_MINUTES)
+    async def reconcile_events(self):
+        """Safety net: queue any pending event the dispatcher is missing, and prune old events
 
-        # Get events that need reminders
-        cursor.execute("""
-            SELECT id, guild_id, channel_id, title, event_time
-            FROM scheduled_events
-            WHERE event_time <= ? AND event_time > ? AND reminder_sent = 0
-        """, (reminder_threshold.isoformat(), now.isoformat()))
+        Events are queued when they are created, so this normally finds nothing.
+        """
+        now = datetime.utcnow()
 
-        events = cursor.fetchall()
+        try:
+            await self._catch_up_series(now)
+
+            missing = 0
+            async for event_id, guild_id, channel_id, title, event_time in self.store.pending_events(now):
+                if ("event", event_id) not in self.timers:
+                    self._schedule_event_reminder(event_id, guild_id, channel_id, title, _from_timestamp(event_time))
+                    missing += 1
+            missing += await self._queue_announced_series(now)
+            if missing:
+                log.info(f"Reconciliation queued {missing} event timers the dispatcher was missing")
+
+            # Clean up old events
+            await self.store.delete_events_before(now - timedelta(days=1))
+            self.listings.invalidate_all()
+        except Exception as e:
+            log.error(f"Failed to check scheduled events: {e}")
+
+    @reconcile_events.before_loop
+    async def before_reconcile_events(self):
+        """Wait until the bot is ready before starting the task"""
+        await self.bot.wait_until_ready()
 
-        for event_id, guild_id, channel_id, title, event_time in events:
-            # Schedule reminders
-            self._schedule_event_reminder(
-                event_id, guild_id, channel_id, title, 
-                datetime.fromisoformat(event_time)
-            )
+    async def _catch_up_series(self, now: datetime):
+        """Move recurring events that were missed (e.g. while offline) on to their next occurrence"""
+        for event_id, event_time, recurrence, series_start in await self.store.stale_series(now):
+            anchor = _from_timestamp(series_start)
+            next_time, recurrence = _next_occurrence(recurrence, anchor, now)
+            await self.store.advance_series(event_id, anchor, next_time, recurrence)
+
+    async def _queue_announced_series(self, now: datetime) -> int:
+        """Queue the advance of every announced series the dispatcher is missing, returning how many"""
+        missing = 0
+        for event_id, guild_id, channel_id, title, event_time, recurrence, series_start in \
+                await self.store.announced_series(now):
+            if ("series", event_id) not in self.timers:
+                self.timers.schedule(
+                    ("series", event_id),
+                    event_time,
+                    (guild_id, channel_id, title, recurrence, _from_timestamp(series_start))
+                )
+                missing += 1
+        return missing
 
-            # Mark as reminded
-            cursor.execute(
-                "UPDATE scheduled_events SET reminder_sent = 1 WHERE id = ?",
-                (event_id,)
-            )
+    async def _advance_series(self, event_id, guild_id, channel_id, title, recurrence, anchor):
+        """Once an occurrence has started, move its series on and queue the next reminder"""
+        next_time, recurrence = _next_occurrence(recurrence, anchor, max(anchor, datetime.utcnow()))
+        await self.store.advance_series(event_id, anchor, next_time, recurrence)
+        self.listings.invalidate(("events", guild_id))
+        if next_time:
+            self._schedule_event_reminder(event_id, guild_id, channel_id, title, next_time)
 
-        # Clean up old events
-        cursor.execute(
-            "DELETE FROM scheduled_events WHERE event_time < ?",
-            ((now - timedelta(days=1)).isoformat(),)
+    def _schedule_event_reminder(self, event_id, guild_id, channel_id, title, event_time):
+        """Schedule a reminder for an event 30 minutes before it starts (or now, if sooner)"""
+        self.timers.schedule(
+            ("event", event_id),
+            max(time.time(), _epoch(event_time - timedelta(minutes=30))),
+            (guild_id, channel_id, title, event_time)
         )
 
-        conn.commit()
-        conn.close()
-
-    @check_events.before_loop
-    async def before_check_events(self):
-        """Wait until the bot is ready before starting the task"""
-        await self.bot.wait_until_ready()
-
-    def _schedule_event_reminder(self, event_id, guild_id, channel_id, title, event_time):
-        """Schedule a reminder for an event"""
-        async def _send_reminder():
-            # Calculate time until event
-            now = datetime.utcnow()
-            time_until = event_time - now
-            minutes_until = int(time_until.total_seconds() / 60)
+    async def _send_event_reminder(self, event_id, guild_id, channel_id, title, event_time):
+        """Announce an upcoming event in its channel, once
+
+        A series stays on this occurrence until it starts, then moves on to the next.
+        An event whose guild or channel can't be found isn't claimed, so
+        reconciliation tries it again.
+        """
+        # Get guild and channel
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            self.metrics.failure("event_guild_missing")
+            return
 
-            # Get guild and channel
-            guild = self.bot.get_guild(guild_id)
-            if not guild:
-                return
+        channel = guild.get_channel(channel_id)
+        if not channel:
+            self.metrics.failure("event_channel_missing")
+            return
 
-            channel = guild.get_channel(channel_id)
-            if not channel:
-                return
+        claimed = await self.store.claim_event_reminder(event_id)
+        if not claimed:
+            return
 
-            # Send reminder
-            embed = discord.Embed(
-                title="🔮 Event Reminder",
-                description=f"**{title}** will begin in {minutes_until} minutes!",
-                color=0x9B59B6
+        recurrence, series_start = claimed
+        if recurrence:
+            self.timers.schedule(
+                ("series", event_id),
+                _epoch(event_time),
+                (guild_id, channel_id, title, recurrence, _from_timestamp(series_start))
             )
 
-            try:
-                await channel.send(embed=embed)
-            except discord.Forbidden:
-                log.error(f"Cannot send reminder in channel {channel_id} (no permissions)")
-            except Exception as e:
-                log.error(f"Error sending event reminder: {e}")
-
-        # Calculate when to send the reminder
+        # Calculate time until event
         now = datetime.utcnow()
-        time_until_reminder = event_time - now - timedelta(minutes=30)
+        time_until = event_time - now
+        minutes_until = int(time_until.total_seconds() / 60)
 
-        # If it's less than 30 minutes until event, send immediately
-        if time_until_reminder.total_seconds() <= 0:
-            self._tasks[event_id] = asyncio.create_task(_send_reminder())
-        else:
-            # Schedule for 30 minutes before
-            self._tasks[event_id] = asyncio.create_task(
-                self._delayed_reminder(
-                    time_until_reminder.total_seconds(),
-                    _send_reminder
-                )
-            )
+        # Send reminder
+        embed = discord.Embed(
+            title="🔮 Event Reminder",
+            description=f"**{title}** will begin in {minutes_until} minutes!",
+            color=0x9B59B6
+        )
 
-    @staticmethod
-    async def _delayed_reminder(delay, callback):
-        """Helper function to delay a reminder"""
-        await asyncio.sleep(delay)
-        await callback()
+        reason = await self._send_embeds(channel, [embed])
+        if reason:
+            self.metrics.failure(f"event_{reason}")
+            log.error(f"Cannot send event reminder in channel {channel_id} ({reason})")
+        else:
+            self.metrics.delivery("event")
 
     @commands.hybrid_command()
     @app_commands.describe(
         title="Event title",
-        date="Date in YYYY-MM-DD format",
-        time="Time in HH:MM format (24-hour)",
+        date="Date, e.g. 2026-10-31, tomorrow, fri or oct 31",
+        time="Time in your time zone, e.g. 18:00 or 6pm",
         description="Optional event description"
     )
     async def schedule(self, ctx, title: str, date: str, time: str, *, description: str = None):
         """Schedule a coven event with reminders"""
-        # Validate date and time format
-        try:
-            event_date = datetime.strptime(f"{date} {time}", "%Y-%m-%d %H:%M")
-        except ValueError:
+        await self._create_event(ctx, title, date, time, description)
+
+    @commands.hybrid_command()
+    @app_commands.describe(
+        title="Event title",
+        date="Date of the first occurrence, e.g. 2026-10-31 or fri",
+        time="Time in your time zone, e.g. 18:00 or 6pm",
+        repeat="daily, weekly, monthly, or an iCalendar RRULE such as FREQ=WEEKLY;BYDAY=MO,TH",
+        description="Optional event description"
+    )
+    async def recurring(self, ctx, title: str, date: str, time: str, repeat: str, *, description: str = None):
+        """Schedule a repeating coven event (cancelling it ends the series)"""
+        await self._create_event(ctx, title, date, time, description, repeat)
+
+    async def _create_event(self, ctx, title, date, time, description, repeat=None):
+        # Read the date and time in the organizer's time zone
+        event_date = parse_when(f"{date} {time}", await self._user_timezone(ctx.author.id))
+        if event_date is None:
             return await ctx.send(
-                "🕰️ Invalid date or time format! Use YYYY-MM-DD and HH:MM (24-hour time).",
+                "🕰️ I couldn't read that date and time! Try `2026-10-31 18:00`, `tomorrow 6pm` or `fri 19:30`.",
                 ephemeral=True
             )
 
@@ -195,38 +926,37 @@ class Scheduler(commands.Cog):
                 ephemeral=True
             )
 
+        # Validate the repeat rule
+        recurrence = None
+        if repeat:
+            try:
+                recurrence = _parse_recurrence(repeat, event_date)
+            except ValueError as e:
+                return await ctx.send(
+                    f"🔁 Invalid repeat rule ({e}). Use daily, weekly, monthly or an RRULE like FREQ=WEEKLY;BYDAY=FR.",
+                    ephemeral=True
+                )
+
         # Store in database
-        conn = sqlite3.connect(self._db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            INSERT INTO scheduled_events 
-            (guild_id, channel_id, creator_id, title, description, event_time, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                ctx.guild.id,
-                ctx.channel.id,
-                ctx.author.id,
-                title,
-                description,
-                event_date.isoformat(),
-                datetime.utcnow().isoformat()
-            )
+        event_id = await self.store.add_event(
+            ctx.guild.id,
+            ctx.channel.id,
+            ctx.author.id,
+            title,
+            description,
+            event_date,
+            recurrence
         )
 
-        event_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-
         # Create embed
         embed = discord.Embed(
             title=f"📅 Event Scheduled: {title}",
             color=0x9B59B6,
             timestamp=event_date
         )
-        embed.add_field(name="Date & Time", value=event_date.strftime("%A, %B %d at %I:%M %p"), inline=False)
+        embed.add_field(name="Date & Time", value=f"<t:{_timestamp(event_date)}:F>", inline=False)
+        if recurrence:
+            embed.add_field(name="Repeats", value=_describe_recurrence(recurrence), inline=False)
         if description:
             embed.add_field(name="Description", value=description, inline=False)
         embed.add_field(name="Organizer", value=ctx.author.mention, inline=True)
@@ -235,143 +965,85 @@ class Scheduler(commands.Cog):
 
         await ctx.send(embed=embed)
 
-        # If event is within 30 minutes, schedule reminder now
-        time_until_event = event_date - datetime.utcnow()
-        if time_until_event <= timedelta(minutes=30):
-            self._schedule_event_reminder(
-                event_id, ctx.guild.id, ctx.channel.id, title, event_date
-            )
+        # Queue the reminder for 30 minutes before (or right away, if it starts sooner)
+        self._schedule_event_reminder(event_id, ctx.guild.id, ctx.channel.id, title, event_date)
+        self.listings.invalidate(("events", ctx.guild.id))
 
     @commands.hybrid_command()
     async def events(self, ctx):
         """List upcoming coven events"""
-        conn = sqlite3.connect(self._db_path)
-        cursor = conn.cursor()
-
-        # Get upcoming events for this guild
-        cursor.execute(
-            """
-            SELECT id, channel_id, creator_id, title, description, event_time
-            FROM scheduled_events
-            WHERE guild_id = ? AND event_time > ?
-            ORDER BY event_time ASC
-            """,
-            (ctx.guild.id, datetime.utcnow().isoformat())
-        )
-
-        events = cursor.fetchall()
-        conn.close()
-
-        if not events:
+        listing = await self._listing(("events", ctx.guild.id))
+        if not listing.count:
             return await ctx.send("📅 No upcoming events scheduled in the coven.", ephemeral=True)
 
-        # Create events list embed
-        embed = discord.Embed(
-            title="📅 Upcoming Coven Events",
-            color=0x9B59B6,
-            description=f"Found {len(events)} upcoming event(s)"
-        )
-
-        for event_id, channel_id, creator_id, title, description, event_time in events:
-            event_datetime = datetime.fromisoformat(event_time)
-            time_until = event_datetime - datetime.utcnow()
-            days, remainder = divmod(time_until.total_seconds(), 86400)
-            hours, remainder = divmod(remainder, 3600)
-            minutes, _ = divmod(remainder, 60)
-
-            time_str = []
-            if days > 0:
-                time_str.append(f"{int(days)}d")
-            if hours > 0 or days > 0:  # Show hours if there are any, or if we already showed days
-                time_str.append(f"{int(hours)}h")
-            time_str.append(f"{int(minutes)}m")
-
-            # Get channel mention
-            channel = self.bot.get_channel(channel_id)
-            channel_mention = channel.mention if channel else "Unknown Channel"
+        async def render(page: int) -> discord.Embed:
+            # The listing may have been refreshed since the buttons were sent
+            listing = await self._listing(("events", ctx.guild.id))
+            events = await listing.page(page)
 
-            # Add field for each event
-            embed.add_field(
-                name=f"📌 {title} (in {' '.join(time_str)})",
-                value=(
-                    f"**When:** <t:{int(event_datetime.timestamp())}:F>\n"
-                    f"**Where:** {channel_mention}\n"
-                    f"**Description:** {description[:150]}{'...' if len(description) > 150 else ''}"
-                ),
-                inline=False
+            # Create events list embed
+            embed = discord.Embed(
+                title="📅 Upcoming Coven Events",
+                color=0x9B59B6,
+                description=f"Found {listing.count} upcoming event(s)"
             )
-        embed = discord.Embed(
-            title="📅 Upcoming Coven Events",
-            color=0x9B59B6,
-            description=f"Found {len(events)} upcoming event(s)"
-        )
-
-        for event_id, channel_id, creator_id, title, description, event_time in events:
-            event_datetime = datetime.fromisoformat(event_time)
-            time_until = event_datetime - datetime.utcnow()
-            days, remainder = divmod(time_until.total_seconds(), 86400)
-            hours, remainder = divmod(remainder, 3600)
-            minutes, _ = divmod(remainder, 60)
-
-            relative_time = []
-            if days > 0:
-                relative_time.append(f"{int(days)} day{'s' if days != 1 else ''}")
-            if hours > 0:
-                relative_time.append(f"{int(hours)} hour{'s' if hours != 1 else ''}")
-            if minutes > 0 and days == 0:
-                relative_time.append(f"{int(minutes)} minute{'s' if minutes != 1 else ''}")
-
-            time_display = ", ".join(relative_time) if relative_time else "Very soon!"
-
-            creator = ctx.guild.get_member(creator_id)
-            creator_name = creator.display_name if creator else "Unknown Witch"
-
-            channel = ctx.guild.get_channel(channel_id)
-            channel_name = channel.mention if channel else "Unknown Channel"
+            embed.set_footer(text=f"Page {page + 1}/{listing.page_count}")
+
+            for event_id, channel_id, creator_id, title, description, recurrence, event_time in events:
+                event_datetime = _from_timestamp(event_time)
+                time_until = event_datetime - datetime.utcnow()
+                days, remainder = divmod(time_until.total_seconds(), 86400)
+                hours, remainder = divmod(remainder, 3600)
+                minutes, _ = divmod(remainder, 60)
+
+                relative_time = []
+                if days > 0:
+                    relative_time.append(f"{int(days)} day{'s' if days != 1 else ''}")
+                if hours > 0:
+                    relative_time.append(f"{int(hours)} hour{'s' if hours != 1 else ''}")
+                if minutes > 0 and days == 0:
+                    relative_time.append(f"{int(minutes)} minute{'s' if minutes != 1 else ''}")
+
+                time_display = ", ".join(relative_time) if relative_time else "Very soon!"
+
+                creator = ctx.guild.get_member(creator_id)
+                creator_name = creator.display_name if creator else "Unknown Witch"
+
+                channel = ctx.guild.get_channel(channel_id)
+                channel_name = channel.mention if channel else "Unknown Channel"
+
+                embed.add_field(
+                    name=f"{title} (in {time_display})",
+                    value=(
+                        f"🕰️ {event_datetime.strftime('%A, %B %d at %I:%M %p')}\n"
+                        f"📌 {channel_name}\n"
+                        f"👤 Organized by {creator_name}\n"
+                        + (f"🔁 Repeats: {_describe_recurrence(recurrence)}\n" if recurrence else "")
+                        + f"🔍 ID: {event_id}"
+                    ),
+                    inline=False
+                )
 
-            embed.add_field(
-                name=f"{title} (in {time_display})",
-                value=(
-                    f"🕰️ {event_datetime.strftime('%A, %B %d at %I:%M %p')}\n"
-                    f"📌 {channel_name}\n"
-                    f"👤 Organized by {creator_name}\n"
-                    f"🔍 ID: {event_id}"
-                ),
-                inline=False
-            )
+            return embed
 
-        await ctx.send(embed=embed)
+        await PageView(ctx.author, render, listing.page_count).start(ctx)
 
     @commands.hybrid_command()
     @app_commands.describe(event_id="ID of the event to cancel")
     @CovenTools.is_warlock()
     async def cancelevent(self, ctx, event_id: int):
         """Cancel a scheduled event (Warlocks only)"""
-        conn = sqlite3.connect(self._db_path)
-        cursor = conn.cursor()
-
-        # Check if event exists and belongs to this guild
-        cursor.execute(
-            "SELECT title, creator_id FROM scheduled_events WHERE id = ? AND guild_id = ?",
-            (event_id, ctx.guild.id)
-        )
-
-        result = cursor.fetchone()
+        # Delete the event if it exists and belongs to this guild
+        result = await self.store.delete_event(event_id, ctx.guild.id)
         if not result:
-            conn.close()
             return await ctx.send("🔍 Event not found! Check the ID and try again.", ephemeral=True)
 
         title, creator_id = result
 
-        # Delete the event
-        cursor.execute("DELETE FROM scheduled_events WHERE id = ?", (event_id,))
-        conn.commit()
-        conn.close()
-
-        # Cancel any running task
-        if event_id in self._tasks:
-            self._tasks[event_id].cancel()
-            del self._tasks[event_id]
+        # Drop its pending reminder
+        self.timers.cancel(("event", event_id))
+        self.timers.cancel(("series", event_id))
+        self.listings.invalidate(("events", ctx.guild.id))
 
         # Notify
         embed = discord.Embed(
@@ -397,220 +1069,321 @@ class Scheduler(commands.Cog):
     @commands.hybrid_command()
     @app_commands.describe(
         reminder="What to remind you about",
-        time="When to remind you (e.g. 30m, 2h, 1d)"
+        time="When: 30m, 1h30m, tomorrow 9am, fri 18:00 or 2026-10-31T18:00"
     )
     async def remind(self, ctx, time: str, *, reminder: str):
         """Set a personal reminder"""
         # Parse time
-        try:
-            duration = self._parse_time(time)
-            if not duration:
-                return await ctx.send(
-                    "⏰ Invalid time format! Use like `30m`, `2h`, `1d`.",
-                    ephemeral=True
-                )
-
-            if duration > timedelta(days=30):
-                return await ctx.send(
-                    "⏰ Reminders can only be set for up to 30 days in the future.",
-                    ephemeral=True
-                )
-        except ValueError:
+        now = datetime.utcnow()
+        remind_time = parse_when(time, await self._user_timezone(ctx.author.id), now.replace(tzinfo=timezone.utc))
+        if remind_time is None:
             return await ctx.send(
-                "⏰ Invalid time format! Use like `30m`, `2h`, `1d`.",
+                "⏰ I couldn't read that time! Try `30m`, `1h30m`, `tomorrow 9am` or `fri 18:00`.",
                 ephemeral=True
             )
 
-        # Calculate reminder time
-        now = datetime.utcnow()
-        remind_time = now + duration
+        duration = remind_time - now
+        if duration <= timedelta(0):
+            return await ctx.send("⏰ That time has already passed!", ephemeral=True)
+        if duration > timedelta(days=30):
+            return await ctx.send(
+                "⏰ Reminders can only be set for up to 30 days in the future.",
+                ephemeral=True
+            )
 
         # Store in database
-        conn = sqlite3.connect(self._db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            INSERT INTO reminders
-            (user_id, channel_id, content, remind_time, created_at)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (
-                ctx.author.id,
-                ctx.channel.id,
-                reminder,
-                remind_time.isoformat(),
-                now.isoformat()
-            )
+        reminder_id = await self.store.add_reminder(
+            ctx.author.id,
+            ctx.channel.id,
+            reminder,
+            remind_time,
+            now
         )
 
-        reminder_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-
         # Schedule reminder
-        user_reminders = self._reminders.setdefault(ctx.author.id, {})
-        user_reminders[reminder_id] = asyncio.create_task(
-            self._send_reminder(ctx.author.id, ctx.channel.id, reminder_id, reminder, duration.total_seconds())
+        self.timers.schedule(
+            ("reminder", reminder_id),
+            _epoch(remind_time),
+            (ctx.author.id, ctx.channel.id, reminder)
         )
+        self.listings.invalidate(("reminders", ctx.author.id))
 
         # Confirmation message
         time_str = self._format_timedelta(duration)
         await ctx.send(
-            f"⏰ I'll remind you about **{reminder}** in {time_str}.",
+            f"⏰ I'll remind you about **{reminder}** in {time_str} (<t:{_timestamp(remind_time)}:f>).",
             ephemeral=True
         )
 
-    async def _send_reminder(self, user_id, channel_id, reminder_id, content, delay):
-        """Send a reminder after the specified delay"""
-        await asyncio.sleep(delay)
+    async def _user_timezone(self, user_id: int) -> tzinfo:
+        """The zone a user's wall-clock times are read in (UTC until they set one)"""
+        zone = self._timezones.get(user_id)
+        if zone is None:
+            name = await self.store.get_timezone(user_id)
+            zone = ZoneInfo(name) if name else timezone.utc
+            self._timezones[user_id] = zone
+        return zone
+
+    @commands.hybrid_command(name="timezone")
+    @app_commands.describe(zone="IANA time zone such as Europe/London or America/New_York")
+    async def set_timezone(self, ctx, zone: str = None):
+        """Show or set the time zone used to read your reminder and event times"""
+        if zone is None:
+            current = await self._user_timezone(ctx.author.id)
+            local = datetime.now(current).strftime("%H:%M")
+            return await ctx.send(f"🌍 Your time zone is **{current}** (it's {local} there).", ephemeral=True)
 
-        # Get user and channel
-        user = self.bot.get_user(user_id)
-        if not user:
-            return
+        try:
+            tz = ZoneInfo(zone.strip())
+        except (ZoneInfoNotFoundError, ValueError):
+            return await ctx.send(
+                "🌍 Unknown time zone! Use an IANA name like `Europe/London` or `America/New_York`.",
+                ephemeral=True
+            )
 
-        channel = self.bot.get_channel(channel_id)
+        await self.store.set_timezone(ctx.author.id, tz.key)
+        self._timezones[ctx.author.id] = tz
+        await ctx.send(
+            f"🌍 Time zone set to **{tz.key}** (it's {datetime.now(tz).strftime('%H:%M')} there).",
+            ephemeral=True
+        )
 
-        # Create embed
-        embed = discord.Embed(
+    async def _deliver_reminders(self, reminders: List[Tuple[int, int, int, str]]):
+        """Deliver due (reminder_id, user_id, channel_id, content) with as few messages as possible
+
+        Each user gets one DM holding all of their due reminders. Reminders that
+        can't be DMed are grouped by channel into one message mentioning every
+        recipient. Rows that were delivered, or can never be (channel gone or
+        forbidden), are deleted in a single statement; transient HTTP failures
+        stay stored and are retried in five minutes.
+        """
+        by_user: Dict[int, List[Tuple[int, int, str]]] = {}
+        for reminder_id, user_id, channel_id, content in reminders:
+            by_user.setdefault(user_id, []).append((reminder_id, channel_id, content))
+
+        # {channel_id: [(reminder_id, user_id, content)]} for users we couldn't DM
+        by_channel: Dict[int, List[Tuple[int, int, str]]] = {}
+        finished: List[int] = []
+        retry: List[Tuple[int, int, int, str]] = []
+
+        async def direct_message(user_id: int, items: List[Tuple[int, int, str]]):
+            user = self.bot.get_user(user_id)
+            if not user:
+                self.metrics.failure("dm_user_missing", len(items))
+            else:
+                reason = await self._send_embeds(user, [self._reminder_embed(content) for _, _, content in items])
+                if not reason:
+                    self.metrics.delivery("dm", len(items))
+                    finished.extend(reminder_id for reminder_id, _, _ in items)
+                    return
+                self.metrics.failure(f"dm_{reason}", len(items))
+            for reminder_id, channel_id, content in items:
+                by_channel.setdefault(channel_id, []).append((reminder_id, user_id, content))
+
+        await asyncio.gather(*[direct_message(user_id, items) for user_id, items in by_user.items()])
+
+        async def channel_message(channel_id: int, items: List[Tuple[int, int, str]]):
+            channel = self.bot.get_channel(channel_id)
+            if not channel:
+                # The bot is ready, so the channel is gone for good
+                self.metrics.failure("channel_missing", len(items))
+                finished.extend(reminder_id for reminder_id, _, _ in items)
+                return
+            # One message per 10 reminders, the most embeds Discord allows
+            for start in range(0, len(items), 10):
+                chunk = items[start:start + 10]
+                mentions = " ".join(dict.fromkeys(f"<@{user_id}>" for _, user_id, _ in chunk))
+                embeds = []
+                for _, user_id, content in chunk:
+                    embed = self._reminder_embed(content)
+                    user = self.bot.get_user(user_id)
+                    if user and len(chunk) > 1:
+                        embed.set_footer(text=f"For {user.display_name}")
+                    embeds.append(embed)
+                reason = await self._send_embeds(channel, embeds, f"{mentions} ⏰ **Reminder:**")
+                if reason:
+                    self.metrics.failure(f"channel_{reason}", len(items) - start)
+                    log.error(f"Cannot send reminders in channel {channel_id} ({reason})")
+                    if reason == "forbidden":
+                        finished.extend(reminder_id for reminder_id, _, _ in items[start:])
+                    else:
+                        retry.extend(
+                            (reminder_id, user_id, channel_id, content)
+                            for reminder_id, user_id, content in items[start:]
+                        )
+                    return
+                self.metrics.delivery("channel", len(chunk))
+                finished.extend(reminder_id for reminder_id, _, _ in chunk)
+
+        await asyncio.gather(*[channel_message(channel_id, items) for channel_id, items in by_channel.items()])
+
+        for reminder_id, user_id, channel_id, content in retry:
+            self.timers.schedule(("reminder", reminder_id), time.time() + 300, (user_id, channel_id, content))
+
+        # Remove from database
+        for user_id in by_user:
+            self.listings.invalidate(("reminders", user_id))
+        try:
+            await self.store.delete_reminders(finished)
+        except Exception as e:
+            self.metrics.failure("db_delete")
+            log.error(f"Failed to delete {len(finished)} delivered reminders: {e}")
+
+    @staticmethod
+    def _reminder_embed(content: str) -> discord.Embed:
+        return discord.Embed(
             title="⏰ Reminder",
             description=content,
             color=0x9B59B6,
             timestamp=datetime.utcnow()
         )
 
-        # Try to DM the user first
+    async def _send_embeds(self, target, embeds: List[discord.Embed], content: Optional[str] = None) -> Optional[str]:
+        """Send embeds to a user or channel, 10 per message; the failure reason if Discord refused
+
+        Sends share a small concurrency limit so a burst of due reminders stays
+        inside Discord's rate limits instead of queueing hundreds of requests
+        behind the same bucket.
+        """
         try:
-            await user.send(embed=embed)
-            sent_dm = True
+            for start in range(0, len(embeds), 10):
+                async with self._send_slots:
+                    await target.send(content, embeds=embeds[start:start + 10])
+            return None
         except discord.Forbidden:
-            sent_dm = False
-
-        # If in a channel and we couldn't DM, send there instead
-        if channel and not sent_dm:
-            try:
-                await channel.send(f"{user.mention} ⏰ **Reminder:**", embed=embed)
-            except discord.Forbidden:
-                log.error(f"Cannot send reminder in channel {channel_id} (no permissions)")
-
-        # Remove from database
-        conn = sqlite3.connect(self._db_path)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM reminders WHERE id = ?", (reminder_id,))
-        conn.commit()
-        conn.close()
-
-        # Remove from active reminders
-        if user_id in self._reminders and reminder_id in self._reminders[user_id]:
-            del self._reminders[user_id][reminder_id]
+            return "forbidden"
+        except discord.HTTPException as e:
+            log.error(f"Failed to send reminder (HTTP {e.status}): {e}")
+            return f"http_{e.status}"
 
     @commands.hybrid_command()
     async def reminders(self, ctx):
         """List your active reminders"""
-        conn = sqlite3.connect(self._db_path)
-        cursor = conn.cursor()
-
-        # Get user's reminders
-        cursor.execute(
-            """
-            SELECT id, content, remind_time
-            FROM reminders
-            WHERE user_id = ?
-            ORDER BY remind_time ASC
-            """,
-            (ctx.author.id,)
-        )
-
-        reminders = cursor.fetchall()
-        conn.close()
-
-        if not reminders:
+        listing = await self._listing(("reminders", ctx.author.id))
+        if not listing.count:
             return await ctx.send("⏰ You have no active reminders.", ephemeral=True)
 
-        # Create list embed
-        embed = discord.Embed(
-            title="⏰ Your Active Reminders",
-            color=0x9B59B6,
-            description=f"You have {len(reminders)} active reminder(s)"
-        )
-
-        now = datetime.utcnow()
-        for reminder_id, content, remind_time in reminders:
-            remind_datetime = datetime.fromisoformat(remind_time)
-            time_left = remind_datetime - now
+        async def render(page: int) -> discord.Embed:
+            listing = await self._listing(("reminders", ctx.author.id))
+            reminders = await listing.page(page)
 
-            embed.add_field(
-                name=f"Reminder #{reminder_id} (in {self._format_timedelta(time_left)})",
-                value=f"```{content}```",
-                inline=False
+            # Create list embed
+            embed = discord.Embed(
+                title="⏰ Your Active Reminders",
+                color=0x9B59B6,
+                description=f"You have {listing.count} active reminder(s)"
             )
+            embed.set_footer(text=f"Page {page + 1}/{listing.page_count}")
 
-        await ctx.send(embed=embed, ephemeral=True)
+            now = datetime.utcnow()
+            for reminder_id, content, remind_time in reminders:
+                remind_datetime = _from_timestamp(remind_time)
+                time_left = remind_datetime - now
+
+                embed.add_field(
+                    name=f"Reminder #{reminder_id} (in {self._format_timedelta(time_left)})",
+                    value=f"```{content}```",
+                    inline=False
+                )
+            return embed
+
+        await PageView(ctx.author, render, listing.page_count).start(ctx, ephemeral=True)
+
+    async def _listing(self, key: Tuple[str, int]) -> Listing:
+        """The cached listing for ("events", guild_id) or ("reminders", user_id), counted on first use"""
+        listing = self.listings.get(key)
+        if listing is None:
+            kind, owner_id = key
+            if kind == "events":
+                start = (_timestamp(datetime.utcnow()), 0)
+                count = await self.store.count_events(owner_id, start)
+                fetch = lambda after, limit: self.store.events_page(owner_id, after, limit)
+                listing = Listing(count, start, EVENTS_PER_PAGE, fetch)
+            else:
+                start = (0, 0)
+                count = await self.store.count_reminders(owner_id)
+                fetch = lambda after, limit: self.store.reminders_page(owner_id, after, limit)
+                listing = Listing(count, start, REMINDERS_PER_PAGE, fetch)
+            self.listings.put(key, listing)
+        return listing
 
     @commands.hybrid_command()
     @app_commands.describe(reminder_id="ID of the reminder to cancel")
     async def cancelreminder(self, ctx, reminder_id: int):
         """Cancel an active reminder"""
-        conn = sqlite3.connect(self._db_path)
-        cursor = conn.cursor()
+        # Delete the reminder if it exists and belongs to user
+        content = await self.store.delete_reminder(reminder_id, ctx.author.id)
+        if content is None:
+            return await ctx.send("⏰ Reminder not found! Check the ID and try again.", ephemeral=True)
 
-        # Check if reminder exists and belongs to user
-        cursor.execute(
-            "SELECT content FROM reminders WHERE id = ? AND user_id = ?",
-            (reminder_id, ctx.author.id)
-        )
+        # Drop its pending timer
+        self.timers.cancel(("reminder", reminder_id))
+        self.listings.invalidate(("reminders", ctx.author.id))
 
-        result = cursor.fetchone()
-        if not result:
-            conn.close()
-            return await ctx.send("⏰ Reminder not found! Check the ID and try again.", ephemeral=True)
+        await ctx.send(f"⏰ Reminder cancelled: **{content}**", ephemeral=True)
 
-        content = result[0]
+    def _pending_counts(self) -> Dict[str, int]:
+        pending = {"event": 0, "reminder": 0, "series": 0}
+        for kind, _ in self.timers:
+            pending[kind] += 1
+        return pending
 
-        # Delete the reminder
-        cursor.execute("DELETE FROM reminders WHERE id = ?", (reminder_id,))
-        conn.commit()
-        conn.close()
+    def _backlog(self) -> float:
+        """Seconds the earliest pending timer is overdue, 0 when nothing is late"""
+        next_due = self.timers.next_due
+        return max(0.0, time.time() - next_due) if next_due else 0.0
 
-        # Cancel any running task
-        if ctx.author.id in self._reminders and reminder_id in self._reminders[ctx.author.id]:
-            self._reminders[ctx.author.id][reminder_id].cancel()
-            del self._reminders[ctx.author.id][reminder_id]
+    async def metrics_text(self) -> str:
+        """Prometheus metrics, for the web app's /metrics endpoint"""
+        return self.metrics.prometheus(self._pending_counts(), self._backlog())
 
-        await ctx.send(f"⏰ Reminder cancelled: **{content}**", ephemeral=True)
+    @commands.hybrid_command()
+    @CovenTools.is_warlock()
+    async def schedulerstats(self, ctx):
+        """Show reminder queue depth, lateness and delivery failures (Warlocks only)"""
+        metrics = self.metrics
+        pending = self._pending_counts()
+        embed = discord.Embed(
+            title="📊 Scheduler Internals",
+            description=(
+                f"**Pending:** {pending['reminder']:,} reminders, {pending['event']:,} event announcements\n"
+                f"**Backlog:** {self._backlog():,.1f}s overdue"
+            ),
+            color=0x9B59B6
+        )
 
-    @staticmethod
-    def _parse_time(time_str: str) -> Optional[timedelta]:
-        """Parse a time string like 30m, 2h, 1d into a timedelta"""
-        if not time_str or len(time_str) < 2:
-            return None
+        fired = sum(metrics.fired.values())
+        if fired:
+            def bound(pct):
+                value = metrics.lateness_percentile(pct)
+                return "∞" if value == float("inf") else f"≤{value:g}s"
 
-        # Check format is a number followed by a unit
-        amount = ""
-        unit = time_str[-1].lower()
+            embed.add_field(
+                name="Lateness",
+                value=(
+                    f"**Fired:** {fired:,} • **Missed (>{metrics.MISSED_AFTER}s late):** {sum(metrics.missed.values()):,}\n"
+                    f"**p50:** {bound(50)} • **p95:** {bound(95)} • **p99:** {bound(99)}\n"
+                    f"**Mean:** {metrics.lateness_sum / fired:,.2f}s • **Max:** {metrics.lateness_max:,.1f}s"
+                ),
+                inline=False
+            )
 
-        for char in time_str[:-1]:
-            if char.isdigit():
-                amount += char
-            else:
-                return None
+        delivered = ", ".join(f"{count:,} {route}" for route, count in sorted(metrics.delivered.items()))
+        failures = "\n".join(
+            f"`{reason}` {count:,}" for reason, count in sorted(metrics.failures.items(), key=lambda item: -item[1])
+        )
+        embed.add_field(name="Delivered", value=delivered or "Nothing yet", inline=False)
+        embed.add_field(name="Failures", value=failures or "None", inline=False)
 
-        if not amount:
-            return None
+        slowest = sorted(metrics.db_ops.items(), key=lambda item: -item[1][1])[:8]
+        if slowest:
+            lines = [
+                f"`{op}` {calls:,.0f} calls, {seconds / calls * 1000:,.2f} ms avg, {worst * 1000:,.1f} ms max"
+                for op, (calls, seconds, worst) in slowest
+            ]
+            embed.add_field(name="Database Time", value="\n".join(lines), inline=False)
 
-        amount = int(amount)
-
-        # Convert to timedelta
-        if unit == "s":
-            return timedelta(seconds=amount)
-        if unit == "m":
-            return timedelta(minutes=amount)
-        if unit == "h":
-            return timedelta(hours=amount)
-        if unit == "d":
-            return timedelta(days=amount)
-        return None
+        await ctx.send(embed=embed, ephemeral=True)
 
     @staticmethod
     def _format_timedelta(delta: timedelta) -> str:
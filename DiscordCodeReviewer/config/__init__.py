@@ -26,6 +26,30 @@ MOD_LOG_CHANNEL_ID = env_int("MOD_LOG_CHANNEL_ID")
 MAX_IMAGES = env_int("MAX_IMAGES", 5)
 TAROT_COOLDOWN = env_int("TAROT_COOLDOWN", 3600)
 
+# Economy ledger settings
+ECONOMY_DURABILITY_WINDOW_MS = env_int("ECONOMY_DURABILITY_WINDOW_MS", 1000)
+ECONOMY_FLUSH_BATCH_SIZE = env_int("ECONOMY_FLUSH_BATCH_SIZE", 500)
+ECONOMY_CACHE_SIZE = env_int("ECONOMY_CACHE_SIZE", 10000)
+ECONOMY_CACHE_TTL = env_int("ECONOMY_CACHE_TTL", 300)  # Seconds, 0 disables expiry
+ECONOMY_CACHE_WRITE_THROUGH = bool(env_int("ECONOMY_CACHE_WRITE_THROUGH", 0))
+ECONOMY_ARCHIVE_AFTER_DAYS = env_int("ECONOMY_ARCHIVE_AFTER_DAYS", 90)
+ECONOMY_ARCHIVE_DIR = os.getenv("ECONOMY_ARCHIVE_DIR", "data/archive")
+ECONOMY_COMPACT_INTERVAL_HOURS = env_int("ECONOMY_COMPACT_INTERVAL_HOURS", 6)
+ECONOMY_IDLE_MINUTES = env_int("ECONOMY_IDLE_MINUTES", 30)  # Close a guild's database after this long unused
+ECONOMY_LEGACY_GUILD_ID = env_int("ECONOMY_LEGACY_GUILD_ID")  # Guild that inherits the old shared economy.db
+
+# Scheduler settings
+SCHEDULER_FIRE_BATCH_SIZE = env_int("SCHEDULER_FIRE_BATCH_SIZE", 25)  # Reminders delivered at once
+SCHEDULER_FIRE_INTERVAL_MS = env_int("SCHEDULER_FIRE_INTERVAL_MS", 1000)  # Pause between full batches
+SCHEDULER_RECONCILE_MINUTES = env_int("SCHEDULER_RECONCILE_MINUTES", 60)  # Re-sync events with the database
+SCHEDULER_SEND_CONCURRENCY = env_int("SCHEDULER_SEND_CONCURRENCY", 5)  # Messages in flight at once
+SCHEDULER_LISTING_CACHE_SIZE = env_int("SCHEDULER_LISTING_CACHE_SIZE", 1000)  # Cached /events and /reminders listings
+SCHEDULER_LISTING_CACHE_TTL = env_int("SCHEDULER_LISTING_CACHE_TTL", 60)  # Seconds
+
+# Moderation settings
+MODERATION_UNMUTE_BATCH_SIZE = env_int("MODERATION_UNMUTE_BATCH_SIZE", 10)  # Expired mutes lifted at once
+MODERATION_UNMUTE_INTERVAL_MS = env_int("MODERATION_UNMUTE_INTERVAL_MS", 1000)  # Pause between full batches
+
 # OpenAI settings
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
@@ -34,5 +58,13 @@ __all__ = [
     'TOKEN', 'COMMAND_PREFIX',
     'WARLOCK_ROLE_ID', 'AUTO_ROLE_ID',
     'TEA_CHANNEL_ID', 'TAROT_CHANNEL_ID', 'ARCHIVE_CATEGORY_ID', 'MOD_LOG_CHANNEL_ID',
-    'MAX_IMAGES', 'TAROT_COOLDOWN', 'OPENAI_API_KEY'
+    'MAX_IMAGES', 'TAROT_COOLDOWN',
+    'ECONOMY_DURABILITY_WINDOW_MS', 'ECONOMY_FLUSH_BATCH_SIZE',
+    'ECONOMY_CACHE_SIZE', 'ECONOMY_CACHE_TTL', 'ECONOMY_CACHE_WRITE_THROUGH',
+    'ECONOMY_ARCHIVE_AFTER_DAYS', 'ECONOMY_ARCHIVE_DIR', 'ECONOMY_COMPACT_INTERVAL_HOURS',
+    'ECONOMY_IDLE_MINUTES', 'ECONOMY_LEGACY_GUILD_ID',
+    'SCHEDULER_FIRE_BATCH_SIZE', 'SCHEDULER_FIRE_INTERVAL_MS', 'SCHEDULER_RECONCILE_MINUTES',
+    'SCHEDULER_SEND_CONCURRENCY', 'SCHEDULER_LISTING_CACHE_SIZE', 'SCHEDULER_LISTING_CACHE_TTL',
+    'MODERATION_UNMUTE_BATCH_SIZE', 'MODERATION_UNMUTE_INTERVAL_MS',
+    'OPENAI_API_KEY'
 ]